@@ -6,11 +6,13 @@ from flask_login import LoginManager
 from flask_mail import Mail
 from flask_wtf.csrf import CSRFProtect
 from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.orm import DeclarativeBase
 from config import Config
+from view_counter import ViewCounter
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'))
 
 class Base(DeclarativeBase):
     pass
@@ -20,6 +22,52 @@ db = SQLAlchemy(model_class=Base)
 login_manager = LoginManager()
 mail = Mail()
 csrf = CSRFProtect()
+view_counter = ViewCounter()
+
+def _apply_ddl(statement, applied):
+    """Run one DDL statement in its own transaction, tolerating a worker that got there first
+
+    Every gunicorn worker upgrades the schema as it boots, so two may race to
+    add the same column or index; the loser's error is ignored once the
+    inspector shows the change is in place.
+    """
+    try:
+        with db.engine.begin() as connection:
+            statement(connection)
+        return True
+    except (OperationalError, ProgrammingError):
+        if not applied(db.inspect(db.engine)):
+            raise
+        return False
+
+def upgrade_schema():
+    """Add nullable columns and indexes introduced after a table was first created"""
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(db.engine.dialect)
+                ddl = db.text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+                if _apply_ddl(lambda connection: connection.execute(ddl),
+                              lambda fresh: column.name in {c['name'] for c in fresh.get_columns(table.name)}):
+                    logging.info(f"Added column {table.name}.{column.name}")
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                _apply_ddl(lambda connection: index.create(connection),
+                           lambda fresh: index.name in {i['name'] for i in fresh.get_indexes(table.name)})
+
+def backfill_data():
+    """Fill values that older rows predate and queries now rely on"""
+    from models import BlogPost
+    # Blog keyset pagination compares published_at, which never matches NULL
+    result = db.session.execute(db.update(BlogPost).where(
+        BlogPost.is_published == True, BlogPost.published_at == None  # noqa: E711,E712
+    ).values(published_at=db.func.coalesce(BlogPost.created_at, db.func.current_timestamp())))
+    db.session.commit()
+    if result.rowcount:
+        logging.info(f"Backfilled published_at for {result.rowcount} blog posts")
 
 def create_app():
     app = Flask(__name__)
@@ -48,6 +96,10 @@ def create_app():
     app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@vitahires.com')
     
+    # Template bytecode cache (before any extension touches app.jinja_env)
+    import templating
+    templating.init_app(app)
+    
     # Initialize extensions
     db.init_app(app)
     login_manager.init_app(app)
@@ -55,6 +107,11 @@ def create_app():
     login_manager.login_message = 'Please log in to access this page.'
     mail.init_app(app)
     csrf.init_app(app)
+    view_counter.init_app(app)
+    
+    # Request instrumentation
+    import metrics
+    metrics.init_app(app)
     
     # User loader
     from models import User
@@ -66,7 +123,10 @@ def create_app():
     # Create tables
     with app.app_context():
         import models  # noqa: F401
-        db.create_all()
+        _apply_ddl(lambda connection: db.metadata.create_all(connection),
+                   lambda fresh: all(fresh.has_table(table.name) for table in db.metadata.sorted_tables))
+        upgrade_schema()
+        backfill_data()
         logging.info("Database tables created")
     
     # Register blueprints
@@ -77,6 +137,10 @@ def create_app():
     app.register_blueprint(dashboard_bp, url_prefix='/dashboard')
     app.register_blueprint(admin_bp, url_prefix='/admin')
     
+    # Periodic retry of the notification outbox
+    from utils import start_notification_drainer
+    start_notification_drainer(app)
+    
     return app
 
 app = create_app()
@@ -0,0 +1,479 @@
+import heapq
+import sys
+import threading
+import time
+from datetime import datetime
+
+TOP_K = 10
+MAX_TERM_LENGTH = 100
+# Estimated bytes per term beyond its characters: node, child-dict slot, share of cached
+# top-k tuples and string headers, as measured by `python autocomplete.py bench`
+TERM_OVERHEAD = 320
+
+def term_cost(key, display):
+    """Estimated memory of one indexed term, used for the byte budget"""
+    return TERM_OVERHEAD + len(key) + len(display)
+
+def _rank(node):
+    return (-node.weight, node.term)
+
+class Node:
+    """Radix trie node; label is the edge from the parent, term is set on terminal nodes"""
+    __slots__ = ('label', 'children', 'term', 'weight', 'top')
+
+    def __init__(self, label):
+        self.label = label
+        self.children = None
+        self.term = None
+        self.weight = 0
+        self.top = None
+
+def _top(node):
+    """Best terminal nodes in a subtree; leaves skip the cache and stand for themselves"""
+    if node.children:
+        return node.top
+    return (node,) if node.term is not None else ()
+
+class PrefixTrie:
+    """Compressed prefix trie caching the top-k terms under every internal node
+
+    A lookup walks at most len(prefix) edges and returns the cached list, so
+    its cost does not depend on how many terms share the prefix. Updates
+    refresh the caches on the path to the changed term only.
+    """
+
+    def __init__(self, k=TOP_K, max_terms=200000, max_bytes=None):
+        self.k = k
+        self.max_terms = max_terms
+        self.max_bytes = max_bytes
+        self.root = Node('')
+        self._terms = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def weight(self, key):
+        node = self._terms.get(key)
+        return node.weight if node else 0
+
+    @property
+    def bytes(self):
+        """Estimated memory held by the indexed terms"""
+        return self._bytes
+
+    def _over_budget(self, fraction=1.0):
+        return (len(self._terms) > self.max_terms * fraction or
+                (self.max_bytes is not None and self._bytes > self.max_bytes * fraction))
+
+    def _refresh(self, node):
+        if not node.children:
+            node.top = None
+            return
+        candidates = [node] if node.term is not None else []
+        for child in node.children.values():
+            candidates.extend(_top(child))
+        node.top = tuple(heapq.nsmallest(self.k, candidates, key=_rank))
+
+    def _insert(self, key):
+        """Path from the root to the node for key, splitting edges as needed"""
+        node = self.root
+        path = [node]
+        rest = key
+        while rest:
+            child = node.children.get(rest[0]) if node.children else None
+            if child is None:
+                child = Node(rest)
+                if node.children is None:
+                    node.children = {}
+                node.children[rest[0]] = child
+                path.append(child)
+                break
+            label = child.label
+            common = 0
+            limit = min(len(label), len(rest))
+            while common < limit and label[common] == rest[common]:
+                common += 1
+            if common < len(label):
+                middle = Node(label[:common])
+                child.label = label[common:]
+                middle.children = {child.label[0]: child}
+                node.children[rest[0]] = middle
+                child = middle
+            node = child
+            path.append(node)
+            rest = rest[common:]
+        return path
+
+    def _find(self, key):
+        """Path from the root to the node for key, or None"""
+        node = self.root
+        path = [node]
+        rest = key
+        while rest:
+            child = node.children.get(rest[0]) if node.children else None
+            if child is None or not rest.startswith(child.label):
+                return None
+            node = child
+            path.append(node)
+            rest = rest[len(child.label):]
+        return path
+
+    def _discard(self, path):
+        """Unlink an emptied terminal and re-compress its neighbours; returns the path still in the trie"""
+        node = path[-1]
+        if not node.children and len(path) > 1:
+            parent = path[-2]
+            del parent.children[node.label[0]]
+            if not parent.children:
+                parent.children = None
+            path.pop()
+            node = parent
+        if len(path) > 1 and node.term is None and node.children and len(node.children) == 1:
+            (child,) = node.children.values()
+            child.label = node.label + child.label
+            path[-2].children[child.label[0]] = child
+            path.pop()
+        return path
+
+    def _update(self, key, display, delta, refresh=True):
+        if delta > 0:
+            path = self._insert(key)
+        else:
+            path = self._find(key)
+            if path is None or path[-1].term is None:
+                return  # Never indexed, or evicted under the memory budget
+        target = path[-1]
+        if target.term is None:
+            target.term = display
+            self._terms[key] = target
+            self._bytes += term_cost(key, display)
+        target.weight += delta
+        if target.weight <= 0:
+            self._bytes -= term_cost(key, target.term)
+            target.term = None
+            target.weight = 0
+            del self._terms[key]
+            path = self._discard(path)
+        if refresh:
+            self._propagate(path, target, delta > 0)
+
+    def _propagate(self, path, target, raised):
+        """Bring the cached top-k lists on path up to date after target's weight changed
+
+        Only caches the term enters, leaves or moves within are touched, and a
+        full recount is needed only where a lowered term may be overtaken; so
+        most updates cost O(depth * k) rather than a scan of every child.
+        """
+        live = target.term is not None
+        for node in reversed(path):
+            if not node.children:
+                node.top = None
+            elif node.top is None:
+                # New or newly branching node: its cache has never been filled
+                self._refresh(node)
+            elif target in node.top:
+                if raised:
+                    node.top = tuple(sorted(node.top, key=_rank))
+                else:
+                    self._refresh(node)
+            elif raised and live and (len(node.top) < self.k or _rank(target) < _rank(node.top[-1])):
+                node.top = tuple(heapq.nsmallest(self.k, node.top + (target,), key=_rank))
+
+    def add(self, key, display, delta=1):
+        """Raise the weight of a term, inserting it if new"""
+        key = key[:MAX_TERM_LENGTH]
+        if not key:
+            return
+        with self._lock:
+            self._update(key, display[:MAX_TERM_LENGTH], delta)
+            if self._over_budget():
+                self._evict()
+
+    def remove(self, key, delta=1):
+        """Lower the weight of a term, deleting it once it reaches zero"""
+        key = key[:MAX_TERM_LENGTH]
+        if not key:
+            return
+        with self._lock:
+            self._update(key, None, -delta)
+
+    def _evict(self):
+        # Drop the terms with the fewest postings per byte until 10% under budget, in one pass
+        # so eviction cost is amortised
+        by_value = sorted(self._terms.items(), key=lambda item: item[1].weight / term_cost(item[0], item[1].term))
+        for key, node in by_value:
+            if not self._over_budget(0.9):
+                break
+            self._update(key, None, -node.weight)
+
+    def complete(self, prefix, limit=TOP_K):
+        """[(term, weight)] of the most popular terms starting with prefix"""
+        node = self.root
+        rest = prefix[:MAX_TERM_LENGTH]
+        with self._lock:
+            while rest:
+                child = node.children.get(rest[0]) if node.children else None
+                if child is None:
+                    return []
+                label = child.label
+                if rest.startswith(label):
+                    rest = rest[len(label):]
+                elif label.startswith(rest):
+                    rest = ''
+                else:
+                    return []
+                node = child
+            return [(match.term, match.weight) for match in _top(node)[:limit]]
+
+    @classmethod
+    def build(cls, terms, k=TOP_K, max_terms=200000, max_bytes=None):
+        """Bulk-load [(key, display, weight)], filling the top-k caches in one bottom-up pass
+
+        Over budget, the terms with the most postings per byte are kept.
+        """
+        trie = cls(k, max_terms, max_bytes)
+        ranked = sorted(((key[:MAX_TERM_LENGTH], display[:MAX_TERM_LENGTH], weight)
+                         for key, display, weight in terms if key and weight > 0),
+                        key=lambda term: -term[2] / term_cost(term[0], term[1]))
+        for key, display, weight in ranked:
+            if len(trie._terms) >= max_terms or (
+                    max_bytes is not None and trie._bytes + term_cost(key, display) > max_bytes):
+                break
+            trie._update(key, display, weight, refresh=False)
+        stack = [(trie.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                trie._refresh(node)
+            elif node.children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+        return trie
+
+def job_terms(title, skills_required, company_name):
+    """Distinct (key, display) suggestion terms contributed by one posting"""
+    from skills import normalize, parse_skills
+    terms = {}
+    for name in [title, company_name] + parse_skills(skills_required):
+        display = ' '.join((name or '').split())
+        if display:
+            terms.setdefault(normalize(display), display)
+    return list(terms.items())
+
+class Autocomplete:
+    """Process-wide suggestion trie over active jobs, weighted by how many postings use each term"""
+
+    def __init__(self):
+        self.trie = None
+        self._job_terms = {}
+        self._expiries = []
+        self._last_job_id = 0
+        self._synced_at = 0
+        self._loaded_at = 0
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    def _active_rows(self, after_id=0, batch_size=5000):
+        from sqlalchemy import or_
+        from app import db
+        from models import Job, EmployerProfile
+        last_id = after_id
+        while True:
+            rows = db.session.query(
+                Job.id, Job.title, Job.skills_required, Job.expires_at, EmployerProfile.company_name
+            ).outerjoin(EmployerProfile, EmployerProfile.user_id == Job.posted_by).filter(
+                Job.id > last_id, Job.is_active == True, Job.is_approved == True,  # noqa: E712
+                or_(Job.expires_at == None, Job.expires_at > datetime.utcnow())  # noqa: E711
+            ).order_by(Job.id).limit(batch_size).all()
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1].id
+
+    def _build(self, app):
+        """Fresh trie and job bookkeeping from the active jobs in the database"""
+        weights = {}
+        job_keys = {}
+        expiries = []
+        last_job_id = 0
+        for job_id, title, skills_required, expires_at, company_name in self._active_rows():
+            terms = job_terms(title, skills_required, company_name)
+            for key, display in terms:
+                entry = weights.get(key)
+                weights[key] = (entry[0], entry[1] + 1) if entry else (display, 1)
+            job_keys[job_id] = tuple(key for key, _ in terms)
+            if expires_at:
+                expiries.append((expires_at, job_id))
+            last_job_id = job_id
+        heapq.heapify(expiries)
+        trie = PrefixTrie.build(((key, display, weight) for key, (display, weight) in weights.items()),
+                                app.config.get('AUTOCOMPLETE_TOP_K', TOP_K),
+                                app.config.get('AUTOCOMPLETE_MAX_TERMS', 200000),
+                                app.config.get('AUTOCOMPLETE_MAX_BYTES'))
+        return trie, job_keys, expiries, last_job_id
+
+    @property
+    def ready(self):
+        return self.trie is not None
+
+    def _install(self, built):
+        self.trie, self._job_terms, self._expiries, self._last_job_id = built
+        self._loaded_at = self._synced_at = time.monotonic()
+
+    def _rebuild_in_background(self, app):
+        def run():
+            try:
+                with app.app_context():
+                    built = self._build(app)
+                with self._lock:
+                    # Postings indexed since the build started are picked up again by id
+                    self._install(built)
+            except Exception as e:
+                app.logger.error(f"Failed to rebuild autocomplete index: {str(e)}")
+            finally:
+                self._rebuilding = False
+        self._rebuilding = True
+        threading.Thread(target=run, daemon=True).start()
+
+    def _add(self, job_id, terms, expires_at):
+        if job_id in self._job_terms:
+            return
+        self._job_terms[job_id] = tuple(key for key, _ in terms)
+        for key, display in terms:
+            self.trie.add(key, display)
+        if expires_at:
+            heapq.heappush(self._expiries, (expires_at, job_id))
+
+    def _remove(self, job_id):
+        for key in self._job_terms.pop(job_id, ()):
+            self.trie.remove(key)
+
+    def _sync_due(self, app):
+        """Under the lock: start rebuilds, drop expired jobs, and return the id to look for
+        new postings after, or None when the last check is recent enough"""
+        if self.trie is None:
+            # Cold worker: build off the request path and suggest nothing until it is installed
+            if not self._rebuilding:
+                self._rebuild_in_background(app)
+            return None
+        now = time.monotonic()
+        # Periodic rebuild picks up deactivations, approvals and edits made elsewhere
+        if (not self._rebuilding and
+                now - self._loaded_at >= app.config.get('AUTOCOMPLETE_REBUILD_INTERVAL', 3600)):
+            self._rebuild_in_background(app)
+        utcnow = datetime.utcnow()
+        while self._expiries and self._expiries[0][0] <= utcnow:
+            self._remove(heapq.heappop(self._expiries)[1])
+        # Jobs posted by other workers; throttled so most keystrokes never reach the database
+        if now - self._synced_at < app.config.get('AUTOCOMPLETE_SYNC_INTERVAL', 10):
+            return None
+        self._synced_at = now
+        return self._last_job_id
+
+    def _sync(self, app):
+        with self._lock:
+            after_id = self._sync_due(app)
+        if after_id is None:
+            return
+        # Queried without the lock so other threads keep answering from the current trie
+        rows = [(job_id, job_terms(title, skills_required, company_name), expires_at)
+                for job_id, title, skills_required, expires_at, company_name in self._active_rows(after_id)]
+        with self._lock:
+            if self.trie is None:
+                return
+            for job_id, terms, expires_at in rows:
+                self._add(job_id, terms, expires_at)
+                self._last_job_id = max(self._last_job_id, job_id)
+
+    def suggest(self, app, prefix, limit=TOP_K):
+        """[(term, active job count)] completing prefix, most popular first"""
+        from skills import normalize
+        key = normalize(prefix)
+        if not key:
+            return []
+        self._sync(app)
+        with self._lock:
+            if self.trie is None:
+                return []
+            return self.trie.complete(key, limit)
+
+    def add_job(self, job, company_name):
+        """Index a newly posted, live job without waiting for the next sync"""
+        with self._lock:
+            if self.trie is not None:
+                self._add(job.id, job_terms(job.title, job.skills_required, company_name), job.expires_at)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if self.trie is not None:
+                self._remove(job_id)
+
+autocomplete = Autocomplete()
+
+def benchmark(term_count=1000000, lookups=20000, k=TOP_K, max_terms=None, max_bytes=None):
+    """Build a trie of synthetic terms under the configured budget and time lookups and updates"""
+    import random
+    import tracemalloc
+    from config import Config
+    max_terms = max_terms or Config.AUTOCOMPLETE_MAX_TERMS
+    max_bytes = max_bytes or Config.AUTOCOMPLETE_MAX_BYTES
+    rng = random.Random(42)
+    syllables = ['an', 'ba', 'co', 'de', 'en', 'fi', 'go', 'ha', 'in', 'jo', 'ka', 'lu', 'ma',
+                 'ne', 'or', 'pa', 'qu', 'ri', 'so', 'ta', 'ul', 've', 'wi', 'xe', 'yo', 'za']
+    terms = {}
+    while len(terms) < term_count:
+        words = [''.join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+                 for _ in range(rng.randint(1, 3))]
+        term = ' '.join(words)
+        # Zipf-like popularity: a few very common terms, a long tail of singletons
+        terms[term] = int(1 / (rng.random() ** 1.2 + 1e-6)) or 1
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    # Display strings are separate objects, as they are for real job terms
+    trie = PrefixTrie.build(((term, term.title(), weight) for term, weight in terms.items()),
+                            k, max_terms, max_bytes)
+    build_seconds = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    keys = list(terms)
+    prefixes = [key[:rng.randint(1, min(len(key), 8))] for key in rng.sample(keys, lookups)]
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        trie.complete(prefix, k)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    # A job posted or closed: one more or one fewer posting for terms already indexed
+    resident = rng.sample(list(trie._terms), min(lookups, len(trie)))
+    started = time.perf_counter()
+    for key in resident:
+        trie.add(key, key)
+        trie.remove(key)
+    update_us = (time.perf_counter() - started) / (2 * len(resident)) * 1e6
+
+    # New terms at the budget, paying for the evictions they cause
+    fresh = [key for key in keys if not trie.weight(key)][:lookups]
+    started = time.perf_counter()
+    for key in fresh:
+        trie.add(key, key)
+    insert_us = (time.perf_counter() - started) / max(1, len(fresh)) * 1e6
+
+    print(f"terms: {len(trie)} of {term_count} (cap {max_terms}, {max_bytes / 2 ** 20:.0f} MiB)  "
+          f"build: {build_seconds:.1f}s  memory: {memory / 2 ** 20:.0f} MiB measured, "
+          f"{trie.bytes / 2 ** 20:.0f} MiB estimated ({memory / len(trie):.0f} B/term)")
+    print(f"lookup p50: {timings[len(timings) // 2] * 1e6:.1f}us  "
+          f"p99: {timings[int(len(timings) * 0.99)] * 1e6:.1f}us  "
+          f"max: {timings[-1] * 1e6:.1f}us  update: {update_us:.1f}us  insert: {insert_us:.1f}us")
+    return timings[int(len(timings) * 0.99)]
+
+if __name__ == '__main__':
+    # Usage: python autocomplete.py bench [terms]
+    if len(sys.argv) < 2 or sys.argv[1] != 'bench':
+        sys.exit('Usage: python autocomplete.py bench [terms]')
+    p99 = benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1000000)
+    sys.exit(0 if p99 < 0.002 else 1)
@@ -0,0 +1,160 @@
+"""Route-level benchmark suite driven through the Flask test client.
+
+Usage: DATABASE_URL=sqlite:///bench.db python bench.py [--save-baseline] [--threshold 0.2]
+Run seed.py against the same database first.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from flask import before_render_template, template_rendered
+from sqlalchemy import event
+from app import app, db
+from models import User, Job
+
+BASELINE_FILE = 'bench_baseline.json'
+
+class QueryCounter:
+    """Counts SQL statements issued on the app's engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+class RenderTimer:
+    """Accumulates Jinja render time across requests"""
+
+    def __init__(self, app):
+        self.seconds = 0.0
+        self._starts = []
+        before_render_template.connect(self._on_before, app, weak=False)
+        template_rendered.connect(self._on_rendered, app, weak=False)
+
+    def _on_before(self, sender, **extra):
+        self._starts.append(time.perf_counter())
+
+    def _on_rendered(self, sender, **extra):
+        self.seconds += time.perf_counter() - self._starts.pop()
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def login_as(client, user_id):
+    """Authenticate the test client by writing the Flask-Login session directly"""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+def build_scenarios():
+    """Resolve the seeded users and jobs each scenario needs"""
+    admin = User.query.filter_by(user_type='admin').first()
+    jobseeker = User.query.filter_by(user_type='jobseeker').first()
+    # The employer with the most postings stresses the dashboard the hardest
+    big_employer = db.session.query(Job.posted_by).group_by(Job.posted_by).order_by(
+        db.func.count(Job.id).desc()
+    ).first()
+    # seed.py ranks job popularity by id, so the lowest visible id is the most applied-to
+    popular_job = db.session.query(Job.id).filter_by(is_active=True, is_approved=True).order_by(
+        Job.id
+    ).first()
+    if not (admin and jobseeker and big_employer and popular_job):
+        sys.exit('Database has no seed data; run seed.py first')
+
+    return [
+        ('main.index', '/', None),
+        ('jobs.list_jobs', '/jobs/', None),
+        ('jobs.list_jobs?keywords', '/jobs/?keywords=Python', None),
+        ('jobs.list_jobs?filters', '/jobs/?category=data-science&job_type=remote&experience_level=senior', None),
+        ('jobs.list_jobs?page=50', '/jobs/?page=50', None),
+        ('jobs.job_detail', f'/jobs/{popular_job.id}', None),
+        ('dashboard.jobseeker', '/dashboard/jobseeker', jobseeker.id),
+        ('dashboard.employer', '/dashboard/employer', big_employer.posted_by),
+        ('admin.dashboard', '/admin/dashboard', admin.id),
+    ]
+
+def run(iterations, warmup):
+    """Time each scenario and return {name: stats}"""
+    results = {}
+    with app.app_context():
+        scenarios = build_scenarios()
+        counter = QueryCounter(db.engine)
+    render_timer = RenderTimer(app)
+
+    for name, url, user_id in scenarios:
+        client = app.test_client()
+        if user_id is not None:
+            login_as(client, user_id)
+        for _ in range(warmup):
+            client.get(url)
+
+        timings = []
+        counter.count = 0
+        render_timer.seconds = 0.0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                sys.exit(f'{name}: {url} returned {response.status_code}')
+        timings.sort()
+        results[name] = {
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': round(counter.count / iterations, 2),
+            'render_ms': round(render_timer.seconds * 1000 / iterations, 3),
+        }
+    return results
+
+def compare(results, baseline, threshold):
+    """Return descriptions of scenarios that regressed beyond the threshold"""
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if stats['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if stats['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {stats['queries']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark key routes against a stored baseline')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 slowdown as a fraction')
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.warmup)
+
+    print(f"{'scenario':<40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'render ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:<40} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['queries']:>8} {stats['render_ms']:>10}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print('Regressions detected:')
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print('No regressions against baseline')
+
+if __name__ == '__main__':
+    main()
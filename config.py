@@ -4,7 +4,7 @@ from datetime import timedelta
 class Config:
     """Application configuration"""
     SECRET_KEY = os.environ.get('SESSION_SECRET') or 'dev-secret-key'
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///vitahires.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///vitahires.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # File upload settings
@@ -21,3 +21,42 @@ class Config:
     
     # Session settings
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
+    
+    # Blog settings
+    BLOG_POSTS_PER_PAGE = 12
+    BLOG_RENDER_CACHE_SIZE = int(os.environ.get('BLOG_RENDER_CACHE_SIZE', '256'))
+    
+    # Job view counting
+    VIEW_FLUSH_INTERVAL = int(os.environ.get('VIEW_FLUSH_INTERVAL', '30'))  # Seconds between batched writes
+    VIEW_MAX_PENDING = 10000  # Buffered (job, day) buckets before an early flush
+    
+    # Notification outbox delivery
+    NOTIFICATION_MAX_ATTEMPTS = 5  # Refused messages are retried with exponential backoff, then left failed
+    NOTIFICATION_CLAIM_TIMEOUT = 600  # Seconds before a crashed drainer's claimed rows are picked up again
+    NOTIFICATION_DRAIN_INTERVAL = int(os.environ.get('NOTIFICATION_DRAIN_INTERVAL', '60'))  # 0 disables the loop
+    
+    # Near-duplicate job detection
+    DEDUPE_THRESHOLD = float(os.environ.get('DEDUPE_THRESHOLD', '0.8'))  # Estimated Jaccard similarity
+    DEDUPE_MODE = os.environ.get('DEDUPE_MODE', 'flag')  # 'flag' holds for review, 'block' rejects
+    DEDUPE_SYNC_INTERVAL = 5  # Seconds between catching up the in-memory band index
+    DEDUPE_RELOAD_INTERVAL = 3600  # Seconds between full reloads of the band index
+    
+    # Sitemap and job feed settings
+    SITE_URL = os.environ.get('SITE_URL', 'https://vitahires.com')  # Base for absolute URLs in feeds
+    FEED_DIR = os.environ.get('FEED_DIR')  # Defaults to instance/feeds
+    
+    # Search autocomplete
+    AUTOCOMPLETE_TOP_K = 10  # Suggestions cached per trie node
+    AUTOCOMPLETE_MAX_TERMS = int(os.environ.get('AUTOCOMPLETE_MAX_TERMS', '200000'))  # ~350 bytes each
+    AUTOCOMPLETE_MAX_BYTES = int(os.environ.get('AUTOCOMPLETE_MAX_BYTES', str(96 * 2 ** 20)))  # Estimated trie memory; binds on long terms
+    AUTOCOMPLETE_SYNC_INTERVAL = 10  # Seconds between checks for jobs posted by other workers
+    AUTOCOMPLETE_REBUILD_INTERVAL = 3600  # Seconds between full rebuilds from the database
+    
+    # Template settings
+    JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR')  # Defaults to instance/jinja_cache
+    
+    # Instrumentation settings
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token for Prometheus scrapers
+    PROFILE_SLOW_REQUEST_MS = int(os.environ.get('PROFILE_SLOW_REQUEST_MS', '0'))  # 0 disables the sampling profiler
+    PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', '0.005'))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
@@ -0,0 +1,307 @@
+import hashlib
+import re
+import sys
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from random import Random
+from sqlalchemy import and_, or_, select, insert, update, delete, bindparam, func
+
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Re-read jobs changed this long before the newest change seen, for transactions that commit late
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+# Fixed seed so signatures stored in the database stay comparable across processes
+_rng = Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERM)]
+
+def shingles(title, description):
+    """Hashed word 3-grams of the normalized posting text"""
+    words = re.findall(r'[a-z0-9]+', f"{title} {description}".lower())
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(words).encode())}
+    return {zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode())
+            for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def signature(title, description):
+    """MinHash signature of a posting as an array of NUM_PERM 32-bit values"""
+    hashes = shingles(title, description)
+    return array('I', (min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+                       for a, b in _PERMUTATIONS))
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+def choose_bands(threshold):
+    """Pick (bands, rows) whose LSH S-curve midpoint is closest to the threshold"""
+    options = [(b, NUM_PERM // b) for b in range(1, NUM_PERM + 1) if NUM_PERM % b == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+def band_keys(sig, bands, rows):
+    """Stable 64-bit bucket for each LSH band of a signature"""
+    return [int.from_bytes(hashlib.blake2b(sig[i * rows:(i + 1) * rows].tobytes(), digest_size=8).digest(),
+                           'big', signed=True)
+            for i in range(bands)]
+
+def _band_rows(job_id, sig, bands, rows):
+    return [{'job_id': job_id, 'band': band, 'bucket': bucket}
+            for band, bucket in enumerate(band_keys(sig, bands, rows))]
+
+def _layout():
+    from flask import current_app
+    return choose_bands(current_app.config.get('DEDUPE_THRESHOLD', 0.8))
+
+def _active(now):
+    from models import Job
+    return and_(Job.is_active == True, Job.is_approved == True,  # noqa: E712
+                or_(Job.expires_at == None, Job.expires_at > now))  # noqa: E711
+
+def index_job(job):
+    """(Re)write a job's band buckets; called when it is posted or approved"""
+    from app import db
+    from models import job_band
+    unindex_job(job.id)
+    if job.content_signature:
+        db.session.execute(insert(job_band), _band_rows(job.id, array('I', job.content_signature), *_layout()))
+
+def unindex_job(job_id):
+    from app import db
+    from models import job_band
+    db.session.execute(delete(job_band).where(job_band.c.job_id == job_id))
+    # This worker sees the change on its next lookup; others within DEDUPE_SYNC_INTERVAL
+    band_index.invalidate()
+
+class BandIndex:
+    """Per-worker copy of the live jobs' band buckets, so candidate lookup never queries the database
+
+    The job_band table stays the source of truth: the copy is loaded from it,
+    caught up from jobs whose updated_at moved, and reloaded periodically.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._jobs = {}
+        self._watermark = None
+        self._synced_at = 0
+        self._loaded_at = 0
+        self._loading = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._watermark is not None
+
+    def _read(self, job_ids=None):
+        """{job_id: (signature, expires_at, band keys)} of live jobs that have band rows"""
+        from app import db
+        from models import Job, job_band
+        query = select(job_band.c.job_id, job_band.c.band, job_band.c.bucket,
+                       Job.content_signature, Job.expires_at).join(
+            Job, Job.id == job_band.c.job_id
+        ).where(_active(datetime.utcnow()))
+        if job_ids is not None:
+            query = query.where(job_band.c.job_id.in_(job_ids))
+        jobs = {}
+        for job_id, band, bucket, raw, expires_at in db.session.execute(query.execution_options(yield_per=10000)):
+            entry = jobs.get(job_id)
+            if entry is None and raw:
+                entry = jobs[job_id] = (array('I', raw), expires_at, [])
+            if entry is not None:
+                entry[2].append((band, bucket))
+        return jobs
+
+    def _load(self, app):
+        from app import db
+        from models import Job
+        with app.app_context():
+            watermark = db.session.query(func.max(Job.updated_at)).scalar() or datetime.utcnow()
+            return self._read(), watermark
+
+    def _changes(self, app, batch_size=500):
+        """Fresh entries for jobs updated since the watermark, and the newest updated_at seen"""
+        from app import db
+        from models import Job
+        with app.app_context():
+            changed = db.session.query(Job.id, Job.updated_at).filter(
+                Job.updated_at >= self._watermark - _SYNC_OVERLAP
+            ).all()
+            jobs = {}
+            for i in range(0, len(changed), batch_size):
+                jobs.update(self._read([job_id for job_id, _ in changed[i:i + batch_size]]))
+        watermark = max((updated_at for _, updated_at in changed), default=self._watermark)
+        return [job_id for job_id, _ in changed], jobs, watermark
+
+    def _add(self, job_id, entry):
+        self._jobs[job_id] = entry
+        for key in entry[2]:
+            self._buckets.setdefault(key, set()).add(job_id)
+
+    def _remove(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        for key in entry[2] if entry else ():
+            members = self._buckets[key]
+            members.discard(job_id)
+            if not members:
+                del self._buckets[key]
+
+    def _install(self, loaded):
+        jobs, watermark = loaded
+        self._jobs = {}
+        self._buckets = {}
+        for job_id, entry in jobs.items():
+            self._add(job_id, entry)
+        self._watermark = watermark
+        self._loaded_at = time.monotonic()
+        self._synced_at = 0  # Catch up on changes made while loading
+
+    def _load_in_background(self, app):
+        def run():
+            try:
+                loaded = self._load(app)
+                with self._lock:
+                    self._install(loaded)
+            except Exception as e:
+                app.logger.error(f"Failed to load duplicate index: {str(e)}")
+            finally:
+                self._loading = False
+        self._loading = True
+        threading.Thread(target=run, daemon=True).start()
+
+    def invalidate(self):
+        self._synced_at = 0
+
+    def _sync(self, app):
+        now = time.monotonic()
+        if not self._loading and (not self.ready or
+                                  now - self._loaded_at >= app.config.get('DEDUPE_RELOAD_INTERVAL', 3600)):
+            # Cold worker or periodic reload, e.g. after `dedupe.py backfill --rebuild`
+            self._load_in_background(app)
+        if not self.ready or now - self._synced_at < app.config.get('DEDUPE_SYNC_INTERVAL', 5):
+            return
+        self._synced_at = now
+        # Query outside the lock so concurrent lookups keep using the current copy
+        changed, jobs, watermark = self._changes(app)
+        with self._lock:
+            for job_id in changed:
+                self._remove(job_id)
+                if job_id in jobs:
+                    self._add(job_id, jobs[job_id])
+            self._watermark = max(self._watermark, watermark)
+
+    def candidates(self, app, sig, bands, rows):
+        """[(job_id, similarity)] of indexed live jobs sharing a band with sig, or None until loaded"""
+        self._sync(app)
+        if not self.ready:
+            return None
+        keys = list(enumerate(band_keys(sig, bands, rows)))
+        now = datetime.utcnow()
+        with self._lock:
+            job_ids = set().union(*(self._buckets.get(key, ()) for key in keys))
+            entries = [(job_id, self._jobs[job_id]) for job_id in job_ids]
+        return [(job_id, similarity(sig, job_sig)) for job_id, (job_sig, expires_at, _) in entries
+                if expires_at is None or expires_at > now]
+
+band_index = BandIndex()
+
+def _query_candidates(sig, bands, rows):
+    from app import db
+    from models import Job, job_band
+    buckets = band_keys(sig, bands, rows)
+    candidates = select(job_band.c.job_id).where(or_(*[
+        and_(job_band.c.band == band, job_band.c.bucket == bucket) for band, bucket in enumerate(buckets)
+    ]))
+    rows = db.session.query(Job.id, Job.content_signature).filter(
+        Job.id.in_(candidates), _active(datetime.utcnow())
+    ).all()
+    return [(job_id, similarity(sig, array('I', raw))) for job_id, raw in rows if raw]
+
+def find_duplicates(sig):
+    """[(job_id, similarity)] of live jobs at or above DEDUPE_THRESHOLD, best first
+
+    Candidates come from this worker's band index (tens of microseconds), or
+    from the job_band table while it loads. Changes made by other workers show
+    up within DEDUPE_SYNC_INTERVAL; this worker's own are seen immediately.
+    """
+    from flask import current_app
+    threshold = current_app.config.get('DEDUPE_THRESHOLD', 0.8)
+    layout = choose_bands(threshold)
+    scored = band_index.candidates(current_app._get_current_object(), sig, *layout)
+    if scored is None:
+        scored = _query_candidates(sig, *layout)
+    return sorted([match for match in scored if match[1] >= threshold],
+                  key=lambda match: match[1], reverse=True)
+
+def _index_row(row, bands, rows):
+    """Signature (computed only if missing) and band rows for one job, run in a worker process"""
+    job_id, title, description, raw = row
+    sig = array('I', raw) if raw else signature(title, description)
+    return job_id, None if raw else sig.tobytes(), _band_rows(job_id, sig, bands, rows)
+
+def backfill(batch_size=10000, processes=None, rebuild=False):
+    """Sign and band every live job that has no band buckets yet, across CPU cores
+
+    Pass rebuild=True after changing DEDUPE_THRESHOLD, which changes the band layout.
+    """
+    from app import db
+    from models import Job, job_band
+
+    if rebuild:
+        db.session.execute(delete(job_band))
+        db.session.commit()
+    work = partial(_index_row, bands=_layout()[0], rows=_layout()[1])
+    unbanded = ~select(job_band.c.job_id).where(job_band.c.job_id == Job.id).exists()
+    total = 0
+    last_id = 0
+    with ProcessPoolExecutor(processes) as pool:
+        while True:
+            rows = db.session.query(Job.id, Job.title, Job.description, Job.content_signature).filter(
+                Job.id > last_id, unbanded, _active(datetime.utcnow())
+            ).order_by(Job.id).limit(batch_size).all()
+            if not rows:
+                return total
+            results = list(pool.map(work, [tuple(row) for row in rows],
+                                    chunksize=max(1, len(rows) // 64)))
+            signed = [{'job_id': job_id, 'signature': raw} for job_id, raw, _ in results if raw]
+            if signed:
+                db.session.execute(
+                    update(Job.__table__).where(Job.__table__.c.id == bindparam('job_id'))
+                    .values(content_signature=bindparam('signature')), signed
+                )
+            db.session.execute(insert(job_band), [band for _, _, bands in results for band in bands])
+            db.session.commit()
+            total += len(rows)
+            last_id = rows[-1].id
+
+def prune():
+    """Drop band buckets of jobs that expired or were deactivated; run from cron"""
+    from app import db
+    from models import Job, job_band
+    now = datetime.utcnow()
+    dead = select(Job.id).where(or_(
+        Job.is_active == False, and_(Job.expires_at != None, Job.expires_at <= now)  # noqa: E711,E712
+    ))
+    result = db.session.execute(delete(job_band).where(job_band.c.job_id.in_(dead)))
+    db.session.commit()
+    return result.rowcount
+
+if __name__ == '__main__':
+    # Usage: python dedupe.py backfill [batch_size] [--rebuild] | python dedupe.py prune
+    from app import app
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not args or args[0] not in ('backfill', 'prune'):
+        sys.exit('Usage: python dedupe.py backfill [batch_size] [--rebuild] | python dedupe.py prune')
+    with app.app_context():
+        if args[0] == 'prune':
+            app.logger.info(f"Pruned {prune()} band buckets")
+        else:
+            count = backfill(int(args[1]) if len(args) > 1 else 10000, rebuild='--rebuild' in sys.argv)
+            app.logger.info(f"Indexed {count} jobs")
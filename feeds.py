@@ -0,0 +1,202 @@
+import os
+import gzip
+import json
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+from flask import url_for
+from sqlalchemy import func, or_, and_
+from app import db
+from models import Job, EmployerProfile
+
+SHARD_SIZE = 10000  # Job ids per shard; sitemaps allow up to 50k URLs per file
+MANIFEST = 'manifest.json'
+# Rows stamped this long before the newest one seen are checked again on the next run:
+# a transaction that commits after the run can carry an earlier posted_at/updated_at
+COMMIT_OVERLAP = timedelta(minutes=5)
+STATIC_ENDPOINTS = ['main.index', 'jobs.list_jobs', 'main.about', 'main.blog_list', 'main.contact']
+
+def active_filter(now):
+    return and_(Job.is_active == True, Job.is_approved == True,  # noqa: E712
+                or_(Job.expires_at == None, Job.expires_at > now))  # noqa: E711
+
+def _write(path, data, compress=True):
+    """Atomically replace path unless it already holds the same bytes; returns whether it was written
+
+    Gzip output uses a fixed mtime so identical content compresses identically,
+    and untouched files keep their Last-Modified for conditional requests.
+    """
+    data = data.encode()
+    if compress:
+        data = gzip.compress(data, mtime=0)
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def _changed_shards(watermark, last_run, now):
+    """Shards holding jobs posted, edited, deactivated or expired since the last run"""
+    since = watermark - COMMIT_OVERLAP
+    changed = db.session.query(func.distinct(Job.id // SHARD_SIZE)).filter(or_(
+        Job.posted_at > since,
+        Job.updated_at > since,
+        and_(Job.expires_at > last_run, Job.expires_at <= now)
+    ))
+    return {shard for (shard,) in changed}
+
+def _shard_jobs(shard, now):
+    return db.session.query(Job, EmployerProfile.company_name).outerjoin(
+        EmployerProfile, EmployerProfile.user_id == Job.posted_by
+    ).filter(
+        Job.id >= shard * SHARD_SIZE, Job.id < (shard + 1) * SHARD_SIZE, active_filter(now)
+    ).order_by(Job.id).all()
+
+def _cdata(text):
+    return '<![CDATA[' + (text or '').replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+def _job_url(job):
+    return url_for('jobs.job_detail', job_id=job.id, _external=True)
+
+def _sitemap(urls):
+    entries = ''.join(f"<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>\n"
+                      for loc, lastmod in urls)
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            f"{entries}</urlset>\n")
+
+def _xml_feed(rows):
+    """Job feed in the common aggregator (Indeed-style) XML layout"""
+    jobs = []
+    for job, company in rows:
+        jobs.append(
+            '<job>'
+            f"<title>{_cdata(job.title)}</title>"
+            f"<date>{job.posted_at.strftime('%a, %d %b %Y %H:%M:%S GMT')}</date>"
+            f"<referencenumber>{job.id}</referencenumber>"
+            f"<url>{escape(_job_url(job))}</url>"
+            f"<company>{_cdata(company)}</company>"
+            f"<city>{_cdata(job.location)}</city>"
+            f"<description>{_cdata(job.description)}</description>"
+            f"<jobtype>{escape(job.job_type or '')}</jobtype>"
+            f"<category>{escape(job.category or '')}</category>"
+            f"<experience>{escape(job.experience_level or '')}</experience>"
+            + (f"<salary>{job.salary_min or ''}-{job.salary_max or ''}</salary>"
+               if job.salary_min or job.salary_max else '')
+            + (f"<expirationdate>{job.expires_at.date().isoformat()}</expirationdate>"
+               if job.expires_at else '')
+            + '</job>\n'
+        )
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n<source>\n<publisher>VitaHires</publisher>\n'
+            + ''.join(jobs) + '</source>\n')
+
+def _json_feed(rows):
+    """Job feed as schema.org JobPosting objects"""
+    postings = []
+    for job, company in rows:
+        posting = {
+            '@context': 'https://schema.org', '@type': 'JobPosting',
+            'identifier': job.id, 'url': _job_url(job), 'title': job.title,
+            'description': job.description, 'datePosted': job.posted_at.isoformat(),
+            'employmentType': job.job_type, 'occupationalCategory': job.category,
+            'hiringOrganization': {'@type': 'Organization', 'name': company},
+            'jobLocation': {'@type': 'Place', 'address': job.location},
+        }
+        if job.expires_at:
+            posting['validThrough'] = job.expires_at.isoformat()
+        if job.salary_min or job.salary_max:
+            posting['baseSalary'] = {'@type': 'MonetaryAmount', 'currency': 'USD',
+                                     'value': {'@type': 'QuantitativeValue',
+                                               'minValue': job.salary_min, 'maxValue': job.salary_max}}
+        postings.append(posting)
+    return json.dumps(postings, separators=(',', ':'))
+
+def generate(app, full=False):
+    """Regenerate changed shards and the sitemap index; returns the shards whose files changed"""
+    output_dir = app.config.get('FEED_DIR') or os.path.join(app.instance_path, 'feeds')
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = {'generated_at': None, 'shards': {}, 'pages': {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    if full:
+        # Rebuild every shard; lastmods still only move for content that changed
+        manifest['generated_at'] = None
+
+    now = datetime.utcnow()
+    # Newest stamp visible now; rows committed later are caught by COMMIT_OVERLAP
+    newest = db.session.query(func.max(Job.posted_at), func.max(Job.updated_at)).one()
+    watermark = max([stamp for stamp in newest if stamp], default=now)
+    # url_for(_external=True) needs a request context bound to the public site URL
+    with app.test_request_context(base_url=app.config['SITE_URL']):
+        live_shards = {shard for (shard,) in db.session.query(
+            func.distinct(Job.id // SHARD_SIZE)
+        ).filter(active_filter(now))}
+        known_shards = {int(shard) for shard in manifest['shards']}
+        if manifest['generated_at'] is None:
+            dirty = live_shards
+        else:
+            last_run = datetime.fromisoformat(manifest['generated_at'])
+            last_watermark = datetime.fromisoformat(manifest.get('watermark') or manifest['generated_at'])
+            dirty = ((_changed_shards(last_watermark, last_run, now) & live_shards)
+                     | (live_shards - known_shards))
+
+        rewritten = []
+        for shard in sorted(dirty):
+            rows = _shard_jobs(shard, now)
+            changed = _write(os.path.join(output_dir, f'sitemap-jobs-{shard}.xml.gz'),
+                             _sitemap((_job_url(job), (job.updated_at or job.posted_at).date().isoformat())
+                                      for job, _ in rows))
+            # Shards re-checked only because of COMMIT_OVERLAP usually come out identical
+            xml_changed = _write(os.path.join(output_dir, f'jobs-{shard}.xml.gz'), _xml_feed(rows))
+            json_changed = _write(os.path.join(output_dir, f'jobs-{shard}.json.gz'), _json_feed(rows))
+            if changed or xml_changed or json_changed:
+                rewritten.append(shard)
+            # Edits that leave the sitemap as it was keep the shard's lastmod in the index
+            if changed or str(shard) not in manifest['shards']:
+                manifest['shards'][str(shard)] = {'lastmod': now.isoformat(), 'count': len(rows)}
+
+        # Shards with no remaining active jobs are dropped
+        for shard in known_shards - live_shards:
+            for name in (f'sitemap-jobs-{shard}.xml.gz', f'jobs-{shard}.xml.gz', f'jobs-{shard}.json.gz'):
+                if os.path.exists(os.path.join(output_dir, name)):
+                    os.remove(os.path.join(output_dir, name))
+            manifest['shards'].pop(str(shard), None)
+
+        # Static pages keep their lastmod until the set of pages changes
+        page_urls = [url_for(endpoint, _external=True) for endpoint in STATIC_ENDPOINTS]
+        pages = manifest.get('pages') or {}
+        if pages.get('urls') != page_urls:
+            pages = manifest['pages'] = {'urls': page_urls, 'lastmod': now.isoformat()}
+        pages_lastmod = datetime.fromisoformat(pages['lastmod'])
+        _write(os.path.join(output_dir, 'sitemap-pages.xml.gz'),
+               _sitemap((url, pages_lastmod.date().isoformat()) for url in page_urls))
+        entries = [(url_for('main.sitemap_file', name='pages', _external=True),
+                    pages_lastmod.isoformat(timespec='seconds') + 'Z')]
+        entries += [(url_for('main.sitemap_file', name=f'jobs-{shard}', _external=True),
+                     datetime.fromisoformat(info['lastmod']).isoformat(timespec='seconds') + 'Z')
+                    for shard, info in sorted(manifest['shards'].items(), key=lambda item: int(item[0]))]
+        _write(os.path.join(output_dir, 'sitemap.xml'), (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + ''.join(f"<sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n"
+                      for loc, lastmod in entries)
+            + '</sitemapindex>\n'
+        ), compress=False)
+
+    manifest['generated_at'] = now.isoformat()
+    manifest['watermark'] = watermark.isoformat()
+    _write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True), compress=False)
+    return rewritten
+
+if __name__ == '__main__':
+    # Usage: python feeds.py [--full]   (run from cron)
+    import sys
+    from app import app
+    with app.app_context():
+        shards = generate(app, full='--full' in sys.argv)
+        app.logger.info(f"Regenerated {len(shards)} feed shard(s)")
@@ -120,6 +120,20 @@ class JobSearchForm(FlaskForm):
 class ApplicationForm(FlaskForm):
     cover_letter = TextAreaField('Cover Letter', validators=[Optional()])
 
+class ApplicationStatusForm(FlaskForm):
+    status = SelectField('Status', choices=[
+        ('pending', 'Pending'),
+        ('reviewed', 'Reviewed'),
+        ('shortlisted', 'Shortlisted'),
+        ('rejected', 'Rejected')
+    ], validators=[DataRequired()])
+
+class JobReviewForm(FlaskForm):
+    action = SelectField('Action', choices=[
+        ('approve', 'Approve'),
+        ('reject', 'Reject')
+    ], validators=[DataRequired()])
+
 class ContactForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired(), Length(min=2, max=100)])
     email = StringField('Email', validators=[DataRequired(), Email()])
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import threading
+from bisect import bisect_left
+from collections import Counter
+from flask import g, request, has_request_context, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bucket upper bounds (seconds for timings, bytes for sizes)
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, rendered in Prometheus text format"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(endpoint)
+            if series is None:
+                # Per-bucket counts plus +Inf, then sum
+                series = self._series[endpoint] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {endpoint: (list(counts), total) for endpoint, (counts, total) in self._series.items()}
+        for endpoint, (counts, total) in sorted(snapshot.items()):
+            label = f'endpoint="{endpoint}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {total}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return '\n'.join(lines)
+
+REQUEST_SECONDS = Histogram('vitahires_request_duration_seconds', 'Wall time per request', TIME_BUCKETS)
+SQL_STATEMENTS = Histogram('vitahires_sql_statements', 'SQL statements executed per request', COUNT_BUCKETS)
+SQL_SECONDS = Histogram('vitahires_sql_duration_seconds', 'Total SQL time per request', TIME_BUCKETS)
+RENDER_SECONDS = Histogram('vitahires_template_render_seconds', 'Total Jinja render time per request', TIME_BUCKETS)
+RESPONSE_BYTES = Histogram('vitahires_response_size_bytes', 'Response body size', SIZE_BUCKETS)
+
+HISTOGRAMS = (REQUEST_SECONDS, SQL_STATEMENTS, SQL_SECONDS, RENDER_SECONDS, RESPONSE_BYTES)
+
+def render_metrics():
+    """Render all histograms in Prometheus text exposition format"""
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+class StackSampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval and folds the stacks for flame graphs"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def dump(self, path):
+        """Write samples in folded-stack format (input for flamegraph.pl / speedscope)"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+# SQLAlchemy engine events
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and conn.info.get('query_start'):
+        elapsed = time.perf_counter() - conn.info['query_start'].pop()
+        g.sql_statements = g.get('sql_statements', 0) + 1
+        g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+
+# Jinja render timing via Flask template signals
+def _before_render(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault('render_starts', []).append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    if has_request_context() and g.get('render_starts'):
+        g.render_seconds = g.get('render_seconds', 0.0) + time.perf_counter() - g.render_starts.pop()
+
+def init_app(app):
+    """Register request instrumentation on the app"""
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    profile_threshold = app.config.get('PROFILE_SLOW_REQUEST_MS')
+    profile_interval = app.config.get('PROFILE_SAMPLE_INTERVAL', 0.005)
+    profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        if profile_threshold:
+            g.sampler = StackSampler(threading.get_ident(), profile_interval)
+            g.sampler.start()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'request_start' not in g or request.endpoint in (None, 'static'):
+            return response
+
+        elapsed = time.perf_counter() - g.request_start
+        endpoint = request.endpoint
+        REQUEST_SECONDS.observe(endpoint, elapsed)
+        SQL_STATEMENTS.observe(endpoint, g.get('sql_statements', 0))
+        SQL_SECONDS.observe(endpoint, g.get('sql_seconds', 0.0))
+        RENDER_SECONDS.observe(endpoint, g.get('render_seconds', 0.0))
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(endpoint, response.calculate_content_length() or 0)
+
+        sampler = g.pop('sampler', None)
+        if sampler is not None:
+            sampler.stop()
+            if elapsed * 1000 >= profile_threshold and sampler.stacks:
+                os.makedirs(profile_dir, exist_ok=True)
+                filename = f"{endpoint}-{int(time.time() * 1000)}.folded"
+                sampler.dump(os.path.join(profile_dir, filename))
+                app.logger.warning(f"Slow request {endpoint} took {elapsed * 1000:.0f}ms, profile saved to {filename}")
+        return response
+
+    @app.teardown_request
+    def stop_sampler(exc):
+        sampler = g.pop('sampler', None)
+        if sampler is not None:
+            sampler.stop()
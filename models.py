@@ -1,9 +1,35 @@
+import re
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, inspect
 from app import db
 
+# Skill associations; the second index serves "who has skill X" lookups
+job_skill = db.Table(
+    'job_skill',
+    db.Column('job_id', db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id'), primary_key=True),
+    db.Index('ix_job_skill_skill_job', 'skill_id', 'job_id')
+)
+
+profile_skill = db.Table(
+    'profile_skill',
+    db.Column('profile_id', db.Integer, db.ForeignKey('job_seeker_profile.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id'), primary_key=True),
+    db.Index('ix_profile_skill_skill_profile', 'skill_id', 'profile_id')
+)
+
+# LSH band buckets of job content signatures, see dedupe.py
+job_band = db.Table(
+    'job_band',
+    db.Column('band', db.SmallInteger, primary_key=True),
+    db.Column('bucket', db.BigInteger, primary_key=True),
+    db.Column('job_id', db.Integer, db.ForeignKey('job.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_job_band_job', 'job_id')
+)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -43,6 +69,8 @@ class JobSeekerProfile(db.Model):
     job_alerts = db.Column(db.Boolean, default=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    skill_tags = db.relationship('Skill', secondary=profile_skill)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -77,11 +105,31 @@ class Job(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     is_approved = db.Column(db.Boolean, default=False)
     posted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     expires_at = db.Column(db.DateTime)
+    content_signature = db.Column(db.LargeBinary)  # MinHash of title + description, see dedupe.py
+    duplicate_of = db.Column(db.Integer, db.ForeignKey('job.id'))  # Set when flagged as a near-duplicate
     
     # Relationships
     applications = db.relationship('Application', backref='job', cascade='all, delete-orphan')
     saved_by = db.relationship('SavedJob', backref='job', cascade='all, delete-orphan')
+    daily_views = db.relationship('JobView', backref='job', cascade='all, delete-orphan')
+    skill_tags = db.relationship('Skill', secondary=job_skill)
+
+class Skill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # Canonical display name
+    key = db.Column(db.String(100), unique=True, nullable=False)  # Normalized lookup key
+    
+    aliases = db.relationship('SkillAlias', backref='skill', cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<Skill {self.name}>'
+
+class SkillAlias(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(100), unique=True, nullable=False)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), nullable=False)
 
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -92,6 +140,41 @@ class Application(db.Model):
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     __table_args__ = (db.UniqueConstraint('job_id', 'user_id', name='unique_job_application'),)
+    
+    status_history = db.relationship('ApplicationStatusHistory', backref='application',
+                                     cascade='all, delete-orphan',
+                                     order_by='ApplicationStatusHistory.changed_at')
+
+class ApplicationStatusHistory(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('application.id'), nullable=False, index=True)
+    old_status = db.Column(db.String(50))
+    new_status = db.Column(db.String(50), nullable=False)
+    changed_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Notification(db.Model):
+    """Outbox of emails, delivered in batches outside the request"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, index=True)
+    # Delivery bookkeeping: which drainer holds the row, and how often sending has failed
+    claimed_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(32), index=True)
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    
+    user = db.relationship('User', backref='notifications')
+
+class JobView(db.Model):
+    """Page views of a job, aggregated per UTC day"""
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
 
 class SavedJob(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -127,3 +210,25 @@ class BlogPost(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     author = db.relationship('User', backref='blog_posts')
+    
+    # Serves the keyset-paginated blog listing
+    __table_args__ = (db.Index('ix_blog_post_published', 'is_published', 'published_at', 'id'),)
+
+def make_excerpt(content, length=200):
+    """Plain-text summary of a post body, cut at a word boundary"""
+    text = ' '.join(re.sub(r'<[^>]+>', ' ', content or '').split())
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0] + '...'
+
+@event.listens_for(BlogPost, 'before_insert')
+@event.listens_for(BlogPost, 'before_update')
+def prepare_blog_post(mapper, connection, post):
+    """Precompute the listing excerpt so the blog list never loads content"""
+    state = inspect(post)
+    content_changed = state.attrs.content.history.has_changes()
+    excerpt_edited = state.attrs.excerpt.history.has_changes()
+    if not post.excerpt or (content_changed and not excerpt_edited):
+        post.excerpt = make_excerpt(post.content)
+    if post.is_published and post.published_at is None:
+        post.published_at = datetime.utcnow()
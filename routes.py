@@ -1,17 +1,28 @@
 import os
+import hmac
+import threading
+from collections import defaultdict
 from datetime import datetime
 from urllib.parse import urlparse
-from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, send_from_directory
+from flask import (Blueprint, render_template, request, redirect, url_for, flash, current_app,
+                   send_from_directory, abort, Response, jsonify)
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
-from sqlalchemy import or_, and_
-from app import db
+from sqlalchemy import or_, and_, select, insert, update, literal
+from sqlalchemy.orm import defer, joinedload
+from app import db, view_counter
 from models import (User, JobSeekerProfile, EmployerProfile, Job, Application, 
-                   SavedJob, Message, BlogPost)
+                   SavedJob, BlogPost, ApplicationStatusHistory, Notification)
 from forms import (LoginForm, JobSeekerRegistrationForm, EmployerRegistrationForm,
                   JobSeekerProfileForm, EmployerProfileForm, JobPostForm, 
-                  JobSearchForm, ApplicationForm, ContactForm, MessageForm)
-from utils import send_email, allowed_file
+                  JobSearchForm, ApplicationForm, ApplicationStatusForm, JobReviewForm, ContactForm,
+                  MessageForm)
+from utils import send_email, allowed_file, render_post_body, deliver_notifications
+from metrics import render_metrics
+from view_models import employer_dashboard, jobseeker_dashboard, admin_dashboard
+from skills import sync_job_skills, sync_profile_skills
+from dedupe import find_duplicates, index_job, unindex_job, signature
+from autocomplete import autocomplete
 
 # Blueprint definitions
 main_bp = Blueprint('main', __name__)
@@ -68,15 +79,46 @@ def terms():
 
 @main_bp.route('/blog')
 def blog_list():
-    """Blog listing page"""
-    posts = BlogPost.query.filter_by(is_published=True).order_by(BlogPost.published_at.desc()).all()
-    return render_template('blog/list.html', posts=posts)
+    """Blog listing page, keyset-paginated on (published_at, id)"""
+    per_page = current_app.config['BLOG_POSTS_PER_PAGE']
+    # Undated posts can't carry a cursor; backfill_data() dates them at startup
+    query = BlogPost.query.filter(BlogPost.is_published == True, BlogPost.published_at != None).options(  # noqa: E711,E712
+        defer(BlogPost.content),
+        joinedload(BlogPost.author).joinedload(User.jobseeker_profile),
+        joinedload(BlogPost.author).joinedload(User.employer_profile)
+    )
+    
+    # Cursor is "<published_at iso>_<id>" of the last post on the previous page
+    cursor = request.args.get('before')
+    if cursor:
+        try:
+            published_at, post_id = cursor.rsplit('_', 1)
+            published_at, post_id = datetime.fromisoformat(published_at), int(post_id)
+        except ValueError:
+            abort(400)
+        query = query.filter(or_(
+            BlogPost.published_at < published_at,
+            and_(BlogPost.published_at == published_at, BlogPost.id < post_id)
+        ))
+    
+    posts = query.order_by(BlogPost.published_at.desc(), BlogPost.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(posts) > per_page:
+        posts = posts[:per_page]
+        next_cursor = f"{posts[-1].published_at.isoformat()}_{posts[-1].id}"
+    
+    return render_template('blog/list.html', posts=posts, next_cursor=next_cursor, is_first_page=not cursor)
 
 @main_bp.route('/blog/<slug>')
 def blog_detail(slug):
     """Individual blog post"""
-    post = BlogPost.query.filter_by(slug=slug, is_published=True).first_or_404()
-    return render_template('blog/detail.html', post=post)
+    post = BlogPost.query.filter_by(slug=slug, is_published=True).options(
+        defer(BlogPost.content),
+        joinedload(BlogPost.author).joinedload(User.jobseeker_profile),
+        joinedload(BlogPost.author).joinedload(User.employer_profile)
+    ).first_or_404()
+    body, read_time = render_post_body(post)
+    return render_template('blog/detail.html', post=post, body=body, read_time=read_time)
 
 # Authentication routes
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -216,12 +258,33 @@ def list_jobs():
         page=page, per_page=12, error_out=False
     )
     
-    return render_template('jobs/list.html', jobs=jobs, form=form)
+    # Current filters for pagination links, minus the page number itself
+    filter_args = {key: value for key, value in request.args.items() if key != 'page'}
+    
+    return render_template('jobs/list.html', jobs=jobs, form=form, filter_args=filter_args)
+
+@jobs_bp.route('/autocomplete')
+def autocomplete_jobs():
+    """Search box suggestions from job titles, skills and company names"""
+    prefix = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 8, type=int), current_app.config['AUTOCOMPLETE_TOP_K']))
+    suggestions = autocomplete.suggest(current_app._get_current_object(), prefix, limit)
+    response = jsonify(query=prefix, suggestions=[{'term': term, 'jobs': count} for term, count in suggestions])
+    if autocomplete.ready:
+        # Empty answers from a still-warming index must not be cached
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+    return response
 
 @jobs_bp.route('/<int:job_id>')
 def job_detail(job_id):
     """Individual job detail page"""
-    job = Job.query.filter_by(id=job_id, is_active=True, is_approved=True).first_or_404()
+    job = db.get_or_404(Job, job_id)
+    is_live = job.is_active and job.is_approved
+    # Jobs awaiting review are visible to the employer who posted them and to admins
+    if not is_live and not (current_user.is_authenticated and
+                            (current_user.id == job.posted_by or current_user.user_type == 'admin')):
+        abort(404)
     
     # Check if user has applied or saved
     has_applied = False
@@ -236,8 +299,11 @@ def job_detail(job_id):
             job_id=job_id, user_id=current_user.id
         ).first() is not None
     
+    if is_live:
+        view_counter.increment(job_id)
+    
     return render_template('jobs/detail.html', job=job, 
-                         has_applied=has_applied, is_saved=is_saved)
+                         has_applied=has_applied, is_saved=is_saved, is_live=is_live)
 
 @jobs_bp.route('/<int:job_id>/apply', methods=['POST'])
 @login_required
@@ -316,6 +382,12 @@ def post_job():
     
     form = JobPostForm()
     if form.validate_on_submit():
+        content_signature = signature(form.title.data, form.description.data)
+        duplicates = find_duplicates(content_signature)
+        if duplicates and current_app.config['DEDUPE_MODE'] == 'block':
+            flash('This posting is nearly identical to an existing job. Please edit the existing posting instead.', 'danger')
+            return render_template('jobs/post.html', form=form)
+        
         job = Job(
             title=form.title.data,
             description=form.description.data,
@@ -329,11 +401,21 @@ def post_job():
             skills_required=form.skills_required.data,
             expires_at=form.expires_at.data,
             posted_by=current_user.id,
-            is_approved=True  # Auto-approve for now
+            content_signature=content_signature.tobytes(),
+            duplicate_of=duplicates[0][0] if duplicates else None,
+            is_approved=not duplicates  # Auto-approve unless it looks like a repost
         )
         db.session.add(job)
+        sync_job_skills(job)
+        index_job(job)
         db.session.commit()
         
+        if duplicates:
+            flash('This job closely matches an existing posting and will be reviewed before it goes live.', 'warning')
+            return redirect(url_for('dashboard.employer'))
+        
+        autocomplete.add_job(job, current_user.employer_profile.company_name
+                             if current_user.employer_profile else None)
         flash('Job posted successfully!', 'success')
         return redirect(url_for('dashboard.employer'))
     
@@ -348,23 +430,7 @@ def jobseeker():
         flash('Access denied', 'danger')
         return redirect(url_for('main.index'))
     
-    # Get user's applications, saved jobs, etc.
-    applications = Application.query.filter_by(user_id=current_user.id).order_by(
-        Application.applied_at.desc()
-    ).all()
-    
-    saved_jobs = SavedJob.query.filter_by(user_id=current_user.id).order_by(
-        SavedJob.saved_at.desc()
-    ).all()
-    
-    messages = Message.query.filter_by(recipient_id=current_user.id).order_by(
-        Message.sent_at.desc()
-    ).limit(5).all()
-    
-    return render_template('dashboard/jobseeker.html', 
-                         applications=applications, 
-                         saved_jobs=saved_jobs,
-                         messages=messages)
+    return render_template('dashboard/jobseeker.html', **jobseeker_dashboard(current_user))
 
 @dashboard_bp.route('/employer')
 @login_required
@@ -374,25 +440,67 @@ def employer():
         flash('Access denied', 'danger')
         return redirect(url_for('main.index'))
     
-    # Get employer's posted jobs and applications
-    posted_jobs = Job.query.filter_by(posted_by=current_user.id).order_by(
-        Job.posted_at.desc()
-    ).all()
+    return render_template('dashboard/employer.html', **employer_dashboard(current_user))
+
+@dashboard_bp.route('/applications/status', methods=['POST'])
+@login_required
+def update_application_status():
+    """Move a selection of applications to a new status in one transaction"""
+    if current_user.user_type != 'employer':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
+    
+    form = ApplicationStatusForm()
+    application_ids = request.form.getlist('application_ids', type=int)
+    if not form.validate_on_submit() or not application_ids:
+        flash('Select at least one application and a valid status', 'danger')
+        return redirect(url_for('dashboard.employer'))
     
-    # Get applications for employer's jobs
-    job_ids = [job.id for job in posted_jobs]
-    applications = Application.query.filter(
-        Application.job_id.in_(job_ids)
-    ).order_by(Application.applied_at.desc()).limit(10).all()
+    new_status = form.status.data
+    # Ownership is enforced in SQL: only applications to this employer's jobs match
+    owned_jobs = select(Job.id).where(Job.posted_by == current_user.id)
+    selection = and_(
+        Application.id.in_(application_ids),
+        Application.job_id.in_(owned_jobs),
+        Application.status != new_status
+    )
+    
+    affected = db.session.query(Application.user_id, Job.title).join(
+        Job, Application.job_id == Job.id
+    ).filter(selection).all()
+    if not affected:
+        flash('No applications needed updating', 'info')
+        return redirect(url_for('dashboard.employer'))
+    
+    now = datetime.utcnow()
+    db.session.execute(insert(ApplicationStatusHistory).from_select(
+        ['application_id', 'old_status', 'new_status', 'changed_by', 'changed_at'],
+        select(Application.id, Application.status, literal(new_status),
+               literal(current_user.id), literal(now)).where(selection)
+    ))
+    db.session.execute(
+        update(Application).where(selection).values(status=new_status)
+        .execution_options(synchronize_session=False)
+    )
+    
+    # One grouped notification per candidate instead of one email per application
+    titles_by_user = defaultdict(list)
+    for user_id, title in affected:
+        titles_by_user[user_id].append(title)
+    db.session.execute(insert(Notification), [{
+        'user_id': user_id,
+        'subject': 'Updates to your job applications',
+        'body': f"The status of your application has changed to {new_status.title()} for:\n"
+                + '\n'.join(f"- {title}" for title in titles),
+        'created_at': now,
+    } for user_id, titles in titles_by_user.items()])
+    db.session.commit()
     
-    messages = Message.query.filter_by(recipient_id=current_user.id).order_by(
-        Message.sent_at.desc()
-    ).limit(5).all()
+    threading.Thread(target=deliver_notifications, args=(current_app._get_current_object(),),
+                     daemon=True).start()
     
-    return render_template('dashboard/employer.html', 
-                         posted_jobs=posted_jobs,
-                         applications=applications,
-                         messages=messages)
+    flash(f'Updated {len(affected)} application(s) to {new_status.title()}', 'success')
+    return redirect(url_for('dashboard.employer'))
 
 @dashboard_bp.route('/profile', methods=['GET', 'POST'])
 @login_required
@@ -418,6 +526,7 @@ def profile():
             
             # Update profile
             form.populate_obj(profile)
+            sync_profile_skills(profile)
             db.session.commit()
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('dashboard.profile'))
@@ -449,23 +558,89 @@ def dashboard():
         flash('Access denied', 'danger')
         return redirect(url_for('main.index'))
     
-    # Get statistics
-    total_users = User.query.count()
-    total_jobs = Job.query.count()
-    pending_jobs = Job.query.filter_by(is_approved=False).count()
-    total_applications = Application.query.count()
+    return render_template('dashboard/admin.html', **admin_dashboard())
+
+@admin_bp.route('/jobs/review', methods=['POST'])
+@login_required
+def review_jobs():
+    """Approve or reject a selection of jobs, e.g. postings flagged as near-duplicates"""
+    if current_user.user_type != 'admin':
+        flash('Access denied', 'danger')
+        return redirect(url_for('main.index'))
     
-    # Recent activity
-    recent_jobs = Job.query.order_by(Job.posted_at.desc()).limit(10).all()
-    recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
+    form = JobReviewForm()
+    job_ids = request.form.getlist('job_ids', type=int)
+    if not form.validate_on_submit() or not job_ids:
+        flash('Select at least one job and a valid action', 'danger')
+        return redirect(url_for('admin.dashboard'))
     
-    return render_template('dashboard/admin.html',
-                         total_users=total_users,
-                         total_jobs=total_jobs,
-                         pending_jobs=pending_jobs,
-                         total_applications=total_applications,
-                         recent_jobs=recent_jobs,
-                         recent_users=recent_users)
+    jobs = Job.query.options(joinedload(Job.posted_by_user).joinedload(User.employer_profile)).filter(
+        Job.id.in_(job_ids)
+    ).all()
+    approve = form.action.data == 'approve'
+    for job in jobs:
+        if approve:
+            job.is_approved = True
+            job.is_active = True
+            index_job(job)
+        else:
+            job.is_active = False
+            unindex_job(job.id)
+    db.session.commit()
+    
+    # Keep this worker's suggestions in step; other workers catch up on their next rebuild
+    for job in jobs:
+        if approve:
+            profile = job.posted_by_user.employer_profile
+            autocomplete.add_job(job, profile.company_name if profile else None)
+        else:
+            autocomplete.remove_job(job.id)
+    
+    flash(f"{'Approved' if approve else 'Rejected'} {len(jobs)} job(s)", 'success')
+    return redirect(url_for('admin.dashboard'))
+
+@admin_bp.route('/metrics')
+def metrics():
+    """Prometheus metrics for admins or scrapers holding METRICS_TOKEN"""
+    token = current_app.config.get('METRICS_TOKEN')
+    authorized = token and hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                               f'Bearer {token}'.encode())
+    if not authorized and not (current_user.is_authenticated and current_user.user_type == 'admin'):
+        abort(403)
+    
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Sitemap and feed routes (files are written by feeds.py)
+def feed_directory():
+    return current_app.config.get('FEED_DIR') or os.path.join(current_app.instance_path, 'feeds')
+
+@main_bp.route('/sitemap.xml')
+def sitemap():
+    """Sitemap index"""
+    return send_from_directory(feed_directory(), 'sitemap.xml', mimetype='application/xml', max_age=3600)
+
+# Shards live at the site root: a sitemap may only list URLs below its own path
+@main_bp.route('/sitemap-<name>.xml.gz')
+def sitemap_file(name):
+    """Gzip-compressed sitemap shard"""
+    return send_from_directory(feed_directory(), f'sitemap-{name}.xml.gz',
+                               mimetype='application/gzip', max_age=3600)
+
+@main_bp.route('/feeds/<filename>')
+def feed_file(filename):
+    """Gzip-compressed job feed shard (jobs-N.xml.gz / jobs-N.json.gz)"""
+    if not filename.startswith('jobs-') or not filename.endswith('.gz'):
+        abort(404)
+    return send_from_directory(feed_directory(), filename, mimetype='application/gzip', max_age=3600)
+
+@main_bp.route('/robots.txt')
+def robots():
+    """Point crawlers at the sitemap once feeds.py has written it"""
+    body = "User-agent: *\n"
+    # Advertising it before the first cron run would send crawlers to a 404
+    if os.path.exists(os.path.join(feed_directory(), 'sitemap.xml')):
+        body += f"Sitemap: {current_app.config['SITE_URL'].rstrip('/')}{url_for('main.sitemap')}\n"
+    return Response(body, mimetype='text/plain')
 
 # File upload route
 @main_bp.route('/uploads/<filename>')
@@ -0,0 +1,241 @@
+"""Deterministic data generator for load testing and benchmarks.
+
+Usage: DATABASE_URL=sqlite:///bench.db python seed.py --jobs 1000000 --seed 42
+"""
+import argparse
+import itertools
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from app import app, db
+from models import (User, JobSeekerProfile, EmployerProfile, Job, Application,
+                    SavedJob, Message)
+
+SEED_PASSWORD = 'password123'
+BATCH_SIZE = 5000
+# Fixed reference point so the same seed always yields identical rows
+EPOCH = datetime(2025, 1, 1)
+
+FIRST_NAMES = ['Ava', 'Liam', 'Noah', 'Emma', 'Sara', 'Omar', 'Ali', 'Mia', 'Zain', 'Lucas',
+               'Hina', 'Ethan', 'Aisha', 'Leo', 'Fatima', 'Chen', 'Priya', 'Diego', 'Yuki', 'Nora']
+LAST_NAMES = ['Khan', 'Smith', 'Garcia', 'Ahmed', 'Chen', 'Patel', 'Brown', 'Lopez', 'Kim', 'Ali',
+              'Nguyen', 'Silva', 'Müller', 'Rossi', 'Tanaka', 'Wilson', 'Hussain', 'Cohen']
+COMPANY_WORDS = ['Tech', 'Data', 'Cloud', 'Health', 'Fin', 'Soft', 'Net', 'Bio', 'Quantum', 'Green',
+                 'Blue', 'Nova', 'Apex', 'Vita', 'Core', 'Pixel', 'Logic', 'Bright']
+COMPANY_SUFFIXES = ['Labs', 'Systems', 'Solutions', 'Works', 'Group', 'Inc', 'Analytics', 'Digital']
+LOCATIONS = ['Karachi', 'Lahore', 'Islamabad', 'London', 'New York', 'San Francisco', 'Berlin',
+             'Dubai', 'Toronto', 'Remote', 'Singapore', 'Austin', 'Amsterdam', 'Sydney']
+INDUSTRIES = ['Software', 'Finance', 'Healthcare', 'Retail', 'Education', 'Telecom', 'Consulting']
+COMPANY_SIZES = ['1-10', '11-50', '51-200', '201-500', '500+']
+CATEGORIES = ['software-development', 'data-science', 'cybersecurity', 'devops', 'mobile-development',
+              'web-development', 'it-support', 'project-management', 'ui-ux-design', 'other']
+JOB_TYPES = ['full-time', 'part-time', 'contract', 'remote']
+EXPERIENCE_LEVELS = ['entry', 'mid', 'senior']
+SENIORITY = ['Junior', 'Senior', 'Lead', 'Staff', 'Principal', '']
+ROLES = ['Python Developer', 'Data Scientist', 'DevOps Engineer', 'Frontend Engineer',
+         'Backend Engineer', 'Security Analyst', 'Android Developer', 'iOS Developer',
+         'Product Designer', 'Project Manager', 'Support Engineer', 'Machine Learning Engineer',
+         'Java Developer', 'JavaScript Developer', 'Cloud Architect', 'QA Engineer']
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Django', 'Flask', 'SQL',
+          'PostgreSQL', 'AWS', 'Azure', 'Docker', 'Kubernetes', 'Go', 'Rust', 'C++', 'Kotlin',
+          'Swift', 'Figma', 'Terraform', 'Linux', 'Pandas', 'PyTorch', 'Spark', 'Node.js']
+APPLICATION_STATUSES = ['pending', 'pending', 'pending', 'reviewed', 'shortlisted', 'rejected']
+LOREM = ('We are looking for a motivated engineer to join our growing team. You will design, '
+         'build and maintain reliable services, collaborate with product and design, review '
+         'code, mentor colleagues and help shape our technical roadmap. ').split()
+
+def zipf_weights(n, exponent):
+    """Cumulative weights for a Zipf-like distribution over n ranked items"""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+def paragraph(rng, words):
+    return ' '.join(rng.choice(LOREM) for _ in range(words)).capitalize() + '.'
+
+def bulk_insert(model, rows):
+    """Insert an iterable of rows in fixed-size batches using executemany
+
+    Rows are drawn lazily, so only one batch is held in memory at a time.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        db.session.execute(insert(model), batch)
+    db.session.commit()
+
+def reset_sequences(*models):
+    """Move PostgreSQL id sequences past rows inserted with explicit ids
+
+    Otherwise the next row the app creates is given id 1 and fails on the
+    primary key. SQLite picks max(rowid) + 1 by itself.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__table__
+        quoted = db.engine.dialect.identifier_preparer.format_table(table)
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence(:table, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {quoted}"
+        ), {'table': quoted})
+    db.session.commit()
+
+def check_counts(employers, jobseekers, jobs, applications, saved_jobs, messages):
+    """Raise ValueError for counts the generator could never satisfy"""
+    if jobs and not employers:
+        raise ValueError('Jobs need at least one employer')
+    # Each (job, job seeker) pair applies or saves at most once
+    for name, count in (('applications', applications), ('saved jobs', saved_jobs)):
+        if count > jobs * jobseekers:
+            raise ValueError(f'At most {jobs * jobseekers} {name} are possible '
+                             f'with {jobs} jobs and {jobseekers} job seekers')
+    if messages and not employers + jobseekers:
+        raise ValueError('Messages need at least one user')
+
+def unique_pairs(rng, count, job_ids, popularity, jobseeker_ids):
+    """Yield count distinct (job_id, user_id) pairs, skewed towards popular jobs"""
+    # Pairs are remembered as single ints to keep the seen-set small at millions of rows
+    stride = jobseeker_ids[-1] + 1 if jobseeker_ids else 1
+    seen = set()
+    while len(seen) < count:
+        job_id = rng.choices(job_ids, cum_weights=popularity)[0]
+        user_id = rng.choice(jobseeker_ids)
+        key = job_id * stride + user_id
+        if key in seen:
+            continue
+        seen.add(key)
+        yield job_id, user_id
+
+def generate(seed=42, employers=2000, jobseekers=50000, jobs=100000, applications=500000,
+             saved_jobs=200000, messages=100000):
+    """Fill the database with reproducible, realistically skewed data"""
+    check_counts(employers, jobseekers, jobs, applications, saved_jobs, messages)
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(SEED_PASSWORD)
+
+    # Users: one admin, then employers, then job seekers, with predictable ids
+    employer_ids = range(2, 2 + employers)
+    jobseeker_ids = range(2 + employers, 2 + employers + jobseekers)
+
+    def users():
+        yield {'id': 1, 'email': 'admin@seed.vitahires.com', 'password_hash': password_hash,
+               'user_type': 'admin', 'is_active': True, 'created_at': EPOCH}
+        for user_id in employer_ids:
+            yield {'id': user_id, 'email': f'employer{user_id}@seed.vitahires.com',
+                   'password_hash': password_hash, 'user_type': 'employer', 'is_active': True,
+                   'created_at': EPOCH + timedelta(minutes=rng.randrange(525600))}
+        for user_id in jobseeker_ids:
+            yield {'id': user_id, 'email': f'seeker{user_id}@seed.vitahires.com',
+                   'password_hash': password_hash, 'user_type': 'jobseeker', 'is_active': True,
+                   'created_at': EPOCH + timedelta(minutes=rng.randrange(525600))}
+    bulk_insert(User, users())
+
+    bulk_insert(EmployerProfile, ({
+        'user_id': user_id,
+        'company_name': f"{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} {rng.choice(COMPANY_SUFFIXES)}",
+        'company_size': rng.choice(COMPANY_SIZES),
+        'industry': rng.choice(INDUSTRIES),
+        'company_description': paragraph(rng, 40) if rng.random() < 0.7 else None,
+        'website': f'https://employer{user_id}.example.com' if rng.random() < 0.6 else None,
+        'location': rng.choice(LOCATIONS),
+        'contact_person': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        'is_verified': rng.random() < 0.3,
+        'updated_at': EPOCH,
+    } for user_id in employer_ids))
+
+    bulk_insert(JobSeekerProfile, ({
+        'user_id': user_id,
+        'first_name': rng.choice(FIRST_NAMES),
+        'last_name': rng.choice(LAST_NAMES),
+        'location': rng.choice(LOCATIONS),
+        'skills': ', '.join(rng.sample(SKILLS, rng.randint(1, 8))),
+        'experience_years': rng.randint(0, 25),
+        'bio': paragraph(rng, 25) if rng.random() < 0.5 else None,
+        'job_alerts': rng.random() < 0.8,
+        'updated_at': EPOCH,
+    } for user_id in jobseeker_ids))
+
+    # Jobs: a handful of big employers post most openings
+    posters = rng.choices(employer_ids, cum_weights=zipf_weights(employers, 1.1), k=jobs) if jobs else []
+
+    def job_rows():
+        for job_id, poster in enumerate(posters, start=1):
+            posted_at = EPOCH + timedelta(minutes=rng.randrange(525600))
+            salary_min = rng.randrange(30, 150) * 1000 if rng.random() < 0.7 else None
+            yield {
+                'id': job_id,
+                'title': f"{rng.choice(SENIORITY)} {rng.choice(ROLES)}".strip(),
+                'description': paragraph(rng, rng.randint(60, 250)),
+                'requirements': paragraph(rng, 30),
+                'location': rng.choice(LOCATIONS),
+                'job_type': rng.choice(JOB_TYPES),
+                'category': rng.choice(CATEGORIES),
+                'salary_min': salary_min,
+                'salary_max': salary_min + rng.randrange(5, 60) * 1000 if salary_min else None,
+                'experience_level': rng.choice(EXPERIENCE_LEVELS),
+                'skills_required': ', '.join(rng.sample(SKILLS, rng.randint(2, 6))),
+                'posted_by': poster,
+                'is_active': rng.random() < 0.85,
+                'is_approved': rng.random() < 0.95,
+                'posted_at': posted_at,
+                'expires_at': posted_at + timedelta(days=rng.choice([14, 30, 60, 90])),
+            }
+    bulk_insert(Job, job_rows())
+    reset_sequences(User, Job)
+
+    # Applications and saved jobs: popular jobs attract most candidates
+    job_ids = range(1, jobs + 1)
+    popularity = zipf_weights(jobs, 0.9)
+    bulk_insert(Application, ({
+        'job_id': job_id, 'user_id': user_id, 'status': rng.choice(APPLICATION_STATUSES),
+        'cover_letter': paragraph(rng, 40) if rng.random() < 0.4 else None,
+        'applied_at': EPOCH + timedelta(minutes=rng.randrange(525600)),
+    } for job_id, user_id in unique_pairs(rng, applications, job_ids, popularity, jobseeker_ids)))
+
+    bulk_insert(SavedJob, ({
+        'job_id': job_id, 'user_id': user_id,
+        'saved_at': EPOCH + timedelta(minutes=rng.randrange(525600)),
+    } for job_id, user_id in unique_pairs(rng, saved_jobs, job_ids, popularity, jobseeker_ids)))
+
+    all_user_ids = range(2, 2 + employers + jobseekers)
+    bulk_insert(Message, ({
+        'sender_id': rng.choice(all_user_ids),
+        'recipient_id': rng.choice(all_user_ids),
+        'subject': f"Regarding {rng.choice(ROLES)}",
+        'content': paragraph(rng, rng.randint(10, 80)),
+        'is_read': rng.random() < 0.5,
+        'sent_at': EPOCH + timedelta(minutes=rng.randrange(525600)),
+    } for _ in range(messages)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed the database with reproducible test data')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--employers', type=int, default=2000)
+    parser.add_argument('--jobseekers', type=int, default=50000)
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--applications', type=int, default=500000)
+    parser.add_argument('--saved-jobs', type=int, default=200000)
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    args = parser.parse_args()
+    try:
+        # Checked before --reset so a typo never wipes the database
+        check_counts(args.employers, args.jobseekers, args.jobs, args.applications,
+                     args.saved_jobs, args.messages)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+        elif User.query.first() is not None:
+            parser.error('Database is not empty; pass --reset to replace its contents')
+        generate(seed=args.seed, employers=args.employers, jobseekers=args.jobseekers,
+                 jobs=args.jobs, applications=args.applications, saved_jobs=args.saved_jobs,
+                 messages=args.messages)
+        app.logger.info(f"Seeded {args.jobs} jobs and {args.applications} applications")
+
+if __name__ == '__main__':
+    main()
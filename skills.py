@@ -0,0 +1,169 @@
+import re
+import sys
+from sqlalchemy import insert, delete
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import Job, JobSeekerProfile, Skill, SkillAlias, job_skill, profile_skill
+
+# Common shorthand mapped to canonical skill names
+DEFAULT_ALIASES = {
+    'js': 'JavaScript', 'ts': 'TypeScript', 'golang': 'Go', 'postgres': 'PostgreSQL',
+    'postgresql': 'PostgreSQL', 'k8s': 'Kubernetes', 'node': 'Node.js', 'nodejs': 'Node.js',
+    'reactjs': 'React', 'react.js': 'React', 'py': 'Python', 'ml': 'Machine Learning',
+    'aws': 'AWS', 'gcp': 'Google Cloud', 'c sharp': 'C#', 'cpp': 'C++',
+}
+
+def normalize(name):
+    """Lookup key for a skill name: lowercase with collapsed whitespace"""
+    return ' '.join(name.lower().split())
+
+def parse_skills(text):
+    """Split a free-form, comma-separated skills field into distinct display names"""
+    names = {}
+    for part in re.split(r'[,;\n]', text or ''):
+        name = ' '.join(part.split())
+        if name and len(name) <= 100:
+            names.setdefault(normalize(name), name)
+    return list(names.values())
+
+def resolve_keys(names):
+    """Map display names to {key: skill id} through the catalog and aliases, creating new skills"""
+    keys = {normalize(name): name for name in names}
+    if not keys:
+        return {}
+
+    ids = dict(db.session.query(SkillAlias.key, SkillAlias.skill_id).filter(
+        SkillAlias.key.in_(keys)
+    ).all())
+    ids.update(db.session.query(Skill.key, Skill.id).filter(
+        Skill.key.in_([key for key in keys if key not in ids])
+    ).all())
+
+    for key, name in keys.items():
+        if key in ids:
+            continue
+        canonical = DEFAULT_ALIASES.get(key)
+        canonical_key = normalize(canonical or name)
+        if canonical_key not in ids:
+            ids[canonical_key] = _get_or_create(Skill, key=canonical_key, name=canonical or name).id
+        if canonical_key != key:
+            # Record the alias so lookups by this spelling find the same skill
+            _get_or_create(SkillAlias, key=key, skill_id=ids[canonical_key])
+        ids[key] = ids[canonical_key]
+    return {key: ids[key] for key in keys}
+
+def _get_or_create(model, key, **values):
+    row = model.query.filter_by(key=key).first()
+    if row is not None:
+        return row
+    row = model(key=key, **values)
+    try:
+        with db.session.begin_nested():
+            db.session.add(row)
+    except IntegrityError:
+        # Another request created it first
+        row = model.query.filter_by(key=key).one()
+    return row
+
+def resolve_skill_ids(names):
+    """Distinct Skill ids for a list of display names"""
+    return list(dict.fromkeys(resolve_keys(names).values()))
+
+def _replace_links(table, owner_column, owner_id, skill_ids):
+    db.session.execute(delete(table).where(table.c[owner_column] == owner_id))
+    if skill_ids:
+        db.session.execute(insert(table), [
+            {owner_column: owner_id, 'skill_id': skill_id} for skill_id in skill_ids
+        ])
+
+def sync_job_skills(job):
+    """Rebuild a job's skill links from its skills_required text"""
+    db.session.flush()
+    _replace_links(job_skill, 'job_id', job.id, resolve_skill_ids(parse_skills(job.skills_required)))
+
+def sync_profile_skills(profile):
+    """Rebuild a profile's skill links from its skills text"""
+    db.session.flush()
+    _replace_links(profile_skill, 'profile_id', profile.id, resolve_skill_ids(parse_skills(profile.skills)))
+
+def find_skill(name):
+    """Look up a skill by name, stored alias or built-in alias"""
+    key = normalize(name)
+    skill = Skill.query.filter_by(key=key).first()
+    if skill is None:
+        alias = SkillAlias.query.filter_by(key=key).first()
+        if alias is not None:
+            skill = db.session.get(Skill, alias.skill_id)
+        elif key in DEFAULT_ALIASES:
+            skill = Skill.query.filter_by(key=normalize(DEFAULT_ALIASES[key])).first()
+    return skill
+
+def jobs_requiring(name):
+    """Query of jobs tagged with a skill, using the (skill_id, job_id) index"""
+    skill = find_skill(name)
+    skill_id = skill.id if skill else None
+    return Job.query.join(job_skill, job_skill.c.job_id == Job.id).filter(
+        job_skill.c.skill_id == skill_id
+    )
+
+def seekers_with(name):
+    """Query of job seeker profiles tagged with a skill, using the (skill_id, profile_id) index"""
+    skill = find_skill(name)
+    skill_id = skill.id if skill else None
+    return JobSeekerProfile.query.join(
+        profile_skill, profile_skill.c.profile_id == JobSeekerProfile.id
+    ).filter(profile_skill.c.skill_id == skill_id)
+
+def load_default_aliases():
+    """Create the canonical skills and aliases in DEFAULT_ALIASES"""
+    resolve_skill_ids(set(DEFAULT_ALIASES.values()))
+    existing = {key for (key,) in db.session.query(SkillAlias.key)}
+    for alias, canonical in DEFAULT_ALIASES.items():
+        if alias not in existing and alias != normalize(canonical):
+            skill = Skill.query.filter_by(key=normalize(canonical)).one()
+            db.session.add(SkillAlias(key=alias, skill_id=skill.id))
+    db.session.commit()
+
+def _backfill(model, text_column, table, owner_column, batch_size, cache):
+    last_id = 0
+    total = 0
+    while True:
+        # Keyset batches keep memory flat and each transaction short
+        rows = db.session.query(model.id, text_column).filter(model.id > last_id).order_by(
+            model.id
+        ).limit(batch_size).all()
+        if not rows:
+            return total
+        owner_ids = [row[0] for row in rows]
+        parsed = [(owner_id, parse_skills(text)) for owner_id, text in rows]
+        # Resolve each batch's unseen names in one pass; the catalog is small enough to cache
+        unseen = {name for _, names in parsed for name in names if normalize(name) not in cache}
+        cache.update(resolve_keys(unseen))
+        links = []
+        for owner_id, names in parsed:
+            skill_ids = dict.fromkeys(cache[normalize(name)] for name in names)
+            links.extend({owner_column: owner_id, 'skill_id': skill_id} for skill_id in skill_ids)
+        db.session.execute(delete(table).where(table.c[owner_column].in_(owner_ids)))
+        if links:
+            db.session.execute(insert(table), links)
+        db.session.commit()
+        total += len(rows)
+        last_id = owner_ids[-1]
+
+def backfill(batch_size=1000):
+    """Populate skill links for every existing job and profile"""
+    load_default_aliases()
+    cache = {}
+    jobs = _backfill(Job, Job.skills_required, job_skill, 'job_id', batch_size, cache)
+    profiles = _backfill(JobSeekerProfile, JobSeekerProfile.skills, profile_skill, 'profile_id',
+                         batch_size, cache)
+    return jobs, profiles
+
+if __name__ == '__main__':
+    # Usage: python skills.py backfill [batch_size]
+    from app import app
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        sys.exit('Usage: python skills.py backfill [batch_size]')
+    with app.app_context():
+        jobs, profiles = backfill(int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
+        app.logger.info(f"Backfilled skills for {jobs} jobs and {profiles} profiles")
@@ -198,17 +198,11 @@ function initializeSearch() {
                 searchForm.submit();
             });
         });
-        
-        // Search suggestions (basic implementation)
-        const keywordInput = searchForm.querySelector('input[name="keywords"]');
-        if (keywordInput) {
-            keywordInput.addEventListener('input', debounce(function() {
-                // Implement search suggestions here
-                // This would typically make an AJAX call to get suggestions
-            }, 300));
-        }
     }
     
+    // Search suggestions for inputs marked with data-autocomplete="<endpoint>"
+    document.querySelectorAll('input[data-autocomplete]').forEach(initializeAutocomplete);
+    
     // Global search functionality
     const globalSearch = document.querySelector('#global-search');
     if (globalSearch) {
@@ -223,6 +217,40 @@ function initializeSearch() {
     }
 }
 
+/**
+ * Attach a suggestion list to a search input
+ */
+function initializeAutocomplete(input) {
+    const list = document.createElement('datalist');
+    list.id = `${input.name}-suggestions`;
+    input.setAttribute('list', list.id);
+    input.after(list);
+    
+    let latest = '';
+    input.addEventListener('input', debounce(function() {
+        const query = input.value.trim();
+        latest = query;
+        if (!query) {
+            list.innerHTML = '';
+            return;
+        }
+        fetch(`${input.dataset.autocomplete}?q=${encodeURIComponent(query)}`)
+            .then(response => response.json())
+            .then(data => {
+                // Ignore responses that arrive after the user kept typing
+                if (data.query.trim() !== latest) return;
+                list.innerHTML = '';
+                data.suggestions.forEach(function(suggestion) {
+                    const option = document.createElement('option');
+                    option.value = suggestion.term;
+                    option.label = `${suggestion.jobs} job${suggestion.jobs === 1 ? '' : 's'}`;
+                    list.appendChild(option);
+                });
+            })
+            .catch(() => {});
+    }, 150));
+}
+
 /**
  * Initialize file upload handling
  */
@@ -0,0 +1,21 @@
+import os
+from jinja2 import FileSystemBytecodeCache
+
+def init_app(app):
+    """Share compiled template bytecode between workers through a directory cache"""
+    cache_dir = app.config.get('JINJA_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    # Must be set before app.jinja_env is first accessed
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(cache_dir)}
+
+def precompile(app):
+    """Compile every template once so workers start with a warm bytecode cache"""
+    names = app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html'))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+if __name__ == '__main__':
+    # Deploy step: python templating.py
+    from app import app
+    app.logger.info(f"Precompiled {precompile(app)} templates")
@@ -0,0 +1,57 @@
+import os
+import sys
+import tempfile
+
+import pytest
+from flask.testing import FlaskClient
+
+# The app is created at import time, so point it at a throwaway database first
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault('SESSION_SECRET', 'test')
+os.environ['NOTIFICATION_DRAIN_INTERVAL'] = '0'  # Tests start the drainer explicitly
+os.environ.setdefault('JINJA_CACHE_DIR', os.path.join(_db_dir, 'jinja_cache'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app, db  # noqa: E402
+
+class IsolatedClient(FlaskClient):
+    """Runs each request in its own app context, so g (and the logged-in user) is not
+    shared with the test's context or with earlier requests"""
+
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+flask_app.test_client_class = IsolatedClient
+
+@pytest.fixture
+def app(monkeypatch):
+    import dedupe
+    flask_app.config['TESTING'] = True
+    flask_app.config['WTF_CSRF_ENABLED'] = False
+    # Per-worker indexes would otherwise outlive the tables wiped below
+    monkeypatch.setattr(dedupe, 'band_index', dedupe.BandIndex())
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def make_user(email, user_type):
+    from models import User
+    user = User(email=email, user_type=user_type)
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
@@ -0,0 +1,91 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import db
+from models import EmployerProfile, Job
+from autocomplete import Autocomplete, PrefixTrie, term_cost
+from conftest import make_user
+
+def wait_until_installed(index, timeout=5):
+    deadline = time.monotonic() + timeout
+    while index.trie is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.trie is not None
+
+def test_cold_index_builds_off_the_request_path(app):
+    employer = make_user('employer@example.com', 'employer')
+    db.session.add(EmployerProfile(user_id=employer.id, company_name='Acme Robotics'))
+    db.session.add(Job(title='Python Developer', description='Build things', location='Remote',
+                       skills_required='Python, Flask', posted_by=employer.id, is_approved=True,
+                       expires_at=datetime.utcnow() + timedelta(days=30)))
+    db.session.commit()
+
+    index = Autocomplete()
+    # The first call only starts the build, so it never waits on the database
+    assert index.suggest(app, 'py') == []
+    wait_until_installed(index)
+    assert index.suggest(app, 'py') == [('Python', 1), ('Python Developer', 1)]
+    assert index.suggest(app, 'acme') == [('Acme Robotics', 1)]
+
+def test_trie_matches_brute_force_under_updates():
+    trie = PrefixTrie(k=3)
+    counts = {}
+    for i, term in enumerate(['go', 'golang', 'google', 'gopher', 'graphql', 'go', 'google', 'go']):
+        trie.add(term, term)
+        counts[term] = counts.get(term, 0) + 1
+        if i % 3 == 2:
+            trie.remove('google')
+            counts['google'] = max(counts.get('google', 0) - 1, 0)
+    for prefix in ['g', 'go', 'goo', 'gr', 'x']:
+        expected = sorted(((term, weight) for term, weight in counts.items()
+                           if weight and term.startswith(prefix)), key=lambda item: (-item[1], item[0]))
+        assert trie.complete(prefix, 3) == expected[:3]
+
+def test_memory_budget_evicts_least_popular_terms():
+    trie = PrefixTrie(k=3, max_terms=100)
+    for i in range(500):
+        trie.add(f'term{i}', f'term{i}', 1 + i % 5)
+    assert len(trie) <= 100
+    assert all(weight == 5 for _, weight in trie.complete('term', 3))
+
+def test_incremental_caches_match_brute_force_under_random_updates():
+    rng = random.Random(7)
+    words = ['go', 'gopher', 'golang', 'google', 'graph', 'graphql', 'gr', 'g', 'java', 'javascript', 'jav']
+    trie = PrefixTrie(k=3)
+    counts = {}
+    for _ in range(2000):
+        term = rng.choice(words)
+        if rng.random() < 0.6:
+            trie.add(term, term)
+            counts[term] = counts.get(term, 0) + 1
+        else:
+            trie.remove(term)
+            counts[term] = max(counts.get(term, 0) - 1, 0)
+        prefix = term[:rng.randint(1, len(term))]
+        expected = sorted(((word, weight) for word, weight in counts.items()
+                           if weight and word.startswith(prefix)), key=lambda item: (-item[1], item[0]))
+        assert trie.complete(prefix, 3) == expected[:3]
+
+def test_byte_budget_keeps_most_postings_per_byte():
+    budget = 10 * term_cost('short', 'short')
+    trie = PrefixTrie(k=3, max_bytes=budget)
+    for i in range(20):
+        trie.add(f'short{i:02d}', f'short{i:02d}', 2)
+        trie.add(f'a much longer term {i:02d}', f'a much longer term {i:02d}', 2)
+    assert trie.bytes <= budget
+    assert trie.complete('a much', 3) == []
+    assert len(trie.complete('short', 3)) == 3
+
+def test_sync_queries_the_database_without_holding_the_lock(app):
+    index = Autocomplete()
+    index._install((PrefixTrie(), {}, [], 0))
+    index._synced_at = 0  # Due for a check of new postings
+    held = []
+
+    def active_rows(after_id=0):
+        held.append(index._lock.locked())
+        yield (1, 'Rust Developer', 'Rust', None, 'Ferrous')
+    index._active_rows = active_rows
+    assert index.suggest(app, 'rust') == [('Rust', 1), ('Rust Developer', 1)]
+    assert held == [False]
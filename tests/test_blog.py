@@ -0,0 +1,81 @@
+import re
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+from markupsafe import Markup
+from sqlalchemy import insert
+
+from app import db, backfill_data
+from models import BlogPost
+from conftest import make_user
+import utils
+
+def add_posts(count, dated):
+    """Insert published posts with Core, bypassing the ORM hook that dates them"""
+    author = make_user('author@example.com', 'admin')
+    base = datetime(2025, 1, 1)
+    db.session.execute(insert(BlogPost), [{
+        'title': f'Post {i}', 'slug': f'post-{i}', 'content': 'Body', 'excerpt': 'Body',
+        'author_id': author.id, 'is_published': True,
+        'created_at': base + timedelta(hours=i),
+        'published_at': base + timedelta(hours=i) if i in dated else None,
+    } for i in range(count)])
+    db.session.commit()
+
+def walk(client):
+    """Slugs of every post reached by following the Older links from the first page"""
+    seen = []
+    url = '/blog'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        seen.extend(slug for slug in dict.fromkeys(re.findall(r'href="/blog/(post-\d+)"', html)))
+        cursor = re.search(r'href="/blog\?before=([^"]+)"', html)
+        url = f'/blog?before={unquote(cursor.group(1))}' if cursor else None
+    return seen
+
+def test_cursor_walk_visits_every_post_once_newest_first(app, client):
+    add_posts(30, dated=range(30))
+    assert walk(client) == [f'post-{i}' for i in reversed(range(30))]
+
+def test_undated_posts_do_not_break_the_cursor(app, client):
+    add_posts(15, dated={0, 1, 2})
+    assert walk(client) == ['post-2', 'post-1', 'post-0']
+
+def test_backfill_dates_published_posts(app, client):
+    add_posts(15, dated={0, 1, 2})
+    backfill_data()
+    assert walk(client) == [f'post-{i}' for i in reversed(range(15))]
+
+def test_malformed_cursor_is_rejected(app, client):
+    assert client.get('/blog?before=yesterday').status_code == 400
+
+def test_rendered_body_is_cached_until_the_post_changes(app, monkeypatch):
+    monkeypatch.setattr(utils, '_rendered_posts', OrderedDict())
+    author = make_user('author@example.com', 'admin')
+    post = BlogPost(title='Hello', slug='hello', content='First line\nSecond line',
+                    author_id=author.id, is_published=True)
+    db.session.add(post)
+    db.session.commit()
+
+    body, minutes = utils.render_post_body(post)
+    assert body == Markup('First line<br>Second line') and minutes == 1
+    assert utils.render_post_body(post) is utils.render_post_body(post)
+
+    post.content = 'Edited'
+    db.session.commit()  # Moves updated_at, so the stale rendering is not served
+    assert utils.render_post_body(post)[0] == Markup('Edited')
+
+def test_render_cache_is_bounded_and_keeps_recent_posts(app, monkeypatch):
+    monkeypatch.setattr(utils, '_rendered_posts', OrderedDict())
+    monkeypatch.setitem(app.config, 'BLOG_RENDER_CACHE_SIZE', 2)
+    stamp = datetime(2025, 1, 1)
+    first, second, third = (SimpleNamespace(id=i, updated_at=stamp, content=f'Post {i}') for i in range(3))
+    utils.render_post_body(first)
+    utils.render_post_body(second)
+    utils.render_post_body(first)  # Now the most recently used
+    utils.render_post_body(third)
+    assert list(utils._rendered_posts) == [(0, stamp), (2, stamp)]
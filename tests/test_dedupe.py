@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+
+import dedupe
+
+from app import db
+from models import Job, job_band
+from dedupe import signature, find_duplicates, index_job, prune
+from conftest import make_user, login
+
+DESCRIPTION = ('We are hiring a backend engineer to design and run our payments platform. '
+               'You will build reliable Python services, review code and mentor the team.')
+
+def post(client, title='Senior Backend Engineer', description=DESCRIPTION):
+    return client.post('/jobs/post', data={
+        'title': title, 'description': description, 'job_type': 'full-time',
+        'category': 'software-development', 'experience_level': 'senior',
+    })
+
+def test_repost_is_flagged_and_visible_to_its_employer(app, client):
+    employer = make_user('employer@example.com', 'employer')
+    login(client, employer)
+    post(client)
+    post(client)
+    original, repost = Job.query.order_by(Job.id).all()
+    assert original.is_approved and not repost.is_approved
+    assert repost.duplicate_of == original.id
+    assert client.get(f'/jobs/{repost.id}').status_code == 200
+    assert app.test_client().get(f'/jobs/{repost.id}').status_code == 404
+
+def test_admin_review_approves_and_rejects(app, client):
+    employer = make_user('employer@example.com', 'employer')
+    login(client, employer)
+    post(client)
+    post(client)
+    post(client)
+    original, first, second = Job.query.order_by(Job.id).all()
+
+    admin = make_user('admin@example.com', 'admin')
+    reviewer = app.test_client()
+    login(reviewer, admin)
+    assert b'Awaiting Review' in reviewer.get('/admin/dashboard').data
+    reviewer.post('/admin/jobs/review', data={'action': 'approve', 'job_ids': [first.id]})
+    reviewer.post('/admin/jobs/review', data={'action': 'reject', 'job_ids': [second.id]})
+    db.session.expire_all()
+    assert first.is_approved and first.is_active
+    assert not second.is_active
+    assert db.session.query(job_band).filter_by(job_id=second.id).count() == 0
+    # The approved repost is now itself a match for new postings
+    assert first.id in dict(find_duplicates(signature(first.title, first.description)))
+
+def test_review_requires_admin(app, client):
+    employer = make_user('employer@example.com', 'employer')
+    login(client, employer)
+    post(client)
+    job = Job.query.one()
+    client.post('/admin/jobs/review', data={'action': 'reject', 'job_ids': [job.id]})
+    db.session.expire_all()
+    assert job.is_active
+
+def test_expired_jobs_are_not_matched_and_pruned(app):
+    employer = make_user('employer@example.com', 'employer')
+    sig = signature('Senior Backend Engineer', DESCRIPTION)
+    job = Job(title='Senior Backend Engineer', description=DESCRIPTION, posted_by=employer.id,
+              is_approved=True, content_signature=sig.tobytes(),
+              expires_at=datetime.utcnow() + timedelta(days=1))
+    db.session.add(job)
+    db.session.flush()
+    index_job(job)
+    db.session.commit()
+    assert [job_id for job_id, _ in find_duplicates(sig)] == [job.id]
+
+    job.expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+    assert find_duplicates(sig) == []
+    assert prune() > 0
+    assert db.session.query(job_band).count() == 0
+
+def test_band_index_tracks_the_table(app):
+    index = dedupe.band_index
+    employer = make_user('employer@example.com', 'employer')
+    sig = signature('Senior Backend Engineer', DESCRIPTION)
+
+    def add_job():
+        job = Job(title='Senior Backend Engineer', description=DESCRIPTION, posted_by=employer.id,
+                  is_approved=True, content_signature=sig.tobytes())
+        db.session.add(job)
+        db.session.flush()
+        index_job(job)
+        db.session.commit()
+        return job
+
+    first = add_job()
+    index._install(index._load(app))
+    assert index.candidates(app, sig, *dedupe._layout()) == [(first.id, 1.0)]
+
+    # Caught up from updated_at on the next lookup, without a reload
+    second = add_job()
+    assert sorted(job_id for job_id, _ in find_duplicates(sig)) == [first.id, second.id]
+
+    # Deactivated by another worker: dropped on the next sync
+    db.session.execute(update(Job.__table__).where(Job.id == first.id)
+                       .values(is_active=False, updated_at=datetime.utcnow()))
+    db.session.commit()
+    index.invalidate()
+    assert [job_id for job_id, _ in find_duplicates(sig)] == [second.id]
+    assert first.id not in index._jobs
@@ -0,0 +1,86 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+
+from app import db
+from models import Job
+from conftest import make_user
+import feeds
+
+def post_jobs(count):
+    employer = make_user('employer@example.com', 'employer')
+    jobs = [Job(title=f'Engineer {i}', description='Build things', location='Remote',
+                posted_by=employer.id, is_approved=True, expires_at=datetime.utcnow() + timedelta(days=30))
+            for i in range(count)]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+def snapshot(directory):
+    """(mtime, bytes) of every published file"""
+    snap = {}
+    for name in os.listdir(directory):
+        if name != feeds.MANIFEST:
+            with open(os.path.join(directory, name), 'rb') as f:
+                snap[name] = (os.stat(os.path.join(directory, name)).st_mtime_ns, f.read())
+    return snap
+
+def test_unchanged_run_touches_nothing(app, tmp_path):
+    app.config['FEED_DIR'] = str(tmp_path)
+    try:
+        post_jobs(3)
+        assert feeds.generate(app) == [0]
+        before = snapshot(tmp_path)
+        assert feeds.generate(app) == []
+        assert snapshot(tmp_path) == before
+        # A full rebuild re-renders shards but keeps identical files and lastmods in place
+        assert feeds.generate(app, full=True) == []
+        assert snapshot(tmp_path) == before
+    finally:
+        app.config['FEED_DIR'] = None
+
+def test_deactivated_job_rewrites_its_shard(app, tmp_path):
+    app.config['FEED_DIR'] = str(tmp_path)
+    try:
+        jobs = post_jobs(3)
+        feeds.generate(app)
+        before = snapshot(tmp_path)
+        jobs[0].is_active = False
+        db.session.commit()
+        assert feeds.generate(app) == [0]
+        after = snapshot(tmp_path)
+        assert after['sitemap-jobs-0.xml.gz'] != before['sitemap-jobs-0.xml.gz']
+        assert after['sitemap-pages.xml.gz'] == before['sitemap-pages.xml.gz']
+    finally:
+        app.config['FEED_DIR'] = None
+
+def test_late_commit_behind_the_watermark_is_published(app, tmp_path):
+    app.config['FEED_DIR'] = str(tmp_path)
+    try:
+        jobs = post_jobs(2)
+        feeds.generate(app)
+        # Stamped before the last run's newest row, but committed after that run
+        late = Job(title='Late Engineer', description='Build things', location='Remote',
+                   posted_by=jobs[0].posted_by, is_approved=True,
+                   posted_at=jobs[0].posted_at - timedelta(seconds=30))
+        db.session.add(late)
+        db.session.commit()
+        db.session.execute(db.update(Job).where(Job.id == late.id)
+                           .values(updated_at=jobs[0].posted_at - timedelta(seconds=30)))
+        db.session.commit()
+        assert feeds.generate(app) == [0]
+        with gzip.open(tmp_path / 'sitemap-jobs-0.xml.gz') as f:
+            assert f'/jobs/{late.id}<'.encode() in f.read()
+    finally:
+        app.config['FEED_DIR'] = None
+
+def test_robots_advertises_sitemap_only_once_generated(app, client, tmp_path):
+    app.config['FEED_DIR'] = str(tmp_path)
+    try:
+        assert b'Sitemap:' not in client.get('/robots.txt').data
+        assert client.get('/sitemap.xml').status_code == 404
+        feeds.generate(app)
+        assert b'/sitemap.xml' in client.get('/robots.txt').data
+        assert client.get('/sitemap.xml').status_code == 200
+    finally:
+        app.config['FEED_DIR'] = None
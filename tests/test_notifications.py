@@ -0,0 +1,91 @@
+import smtplib
+import time
+from contextlib import contextmanager
+
+from app import db
+from models import User, Notification
+from conftest import make_user
+import utils
+
+class FakeConnection:
+    def __init__(self, refused=(), sent=None):
+        self.refused = set(refused)
+        self.sent = sent if sent is not None else []
+
+    def send(self, message):
+        recipient = message.recipients[0]
+        if recipient in self.refused:
+            raise smtplib.SMTPRecipientsRefused({recipient: (550, b'No such user')})
+        self.sent.append(recipient)
+
+def use_connection(monkeypatch, connection):
+    @contextmanager
+    def connect():
+        yield connection
+    monkeypatch.setattr(utils.mail, 'connect', connect)
+
+def queue(*emails):
+    for email in emails:
+        user = make_user(email, 'jobseeker')
+        db.session.add(Notification(user_id=user.id, subject='Update', body='Body'))
+    db.session.commit()
+
+def test_refused_message_does_not_block_the_queue(app, monkeypatch):
+    queue('bad@example.com', 'a@example.com', 'b@example.com')
+    connection = FakeConnection(refused={'bad@example.com'})
+    use_connection(monkeypatch, connection)
+
+    assert utils.deliver_notifications(app, batch_size=2) == 2
+    assert connection.sent == ['a@example.com', 'b@example.com']
+    bad = Notification.query.join(User).filter(User.email == 'bad@example.com').one()
+    assert bad.sent_at is None and bad.attempts == 1 and bad.claimed_by is None
+    assert '550' in bad.last_error and bad.next_attempt_at is not None
+
+def test_refused_message_gives_up_after_max_attempts(app, monkeypatch):
+    queue('bad@example.com')
+    use_connection(monkeypatch, FakeConnection(refused={'bad@example.com'}))
+    app.config['NOTIFICATION_MAX_ATTEMPTS'] = 2
+    try:
+        for _ in range(3):
+            utils.deliver_notifications(app)
+            Notification.query.update({'next_attempt_at': None})  # Skip the backoff wait
+            db.session.commit()
+        assert Notification.query.one().attempts == 2
+    finally:
+        app.config['NOTIFICATION_MAX_ATTEMPTS'] = 5
+
+def test_claimed_rows_are_not_claimed_twice(app):
+    queue('a@example.com', 'b@example.com')
+    first = utils._claim_notifications(app, 10)
+    second = utils._claim_notifications(app, 10)
+    assert Notification.query.filter_by(claimed_by=first).count() == 2
+    assert Notification.query.filter_by(claimed_by=second).count() == 0
+
+def test_unreachable_server_releases_claims_without_charging_attempts(app, monkeypatch):
+    queue('a@example.com')
+
+    @contextmanager
+    def connect():
+        raise OSError('Connection refused')
+        yield
+    monkeypatch.setattr(utils.mail, 'connect', connect)
+
+    assert utils.deliver_notifications(app) == 0
+    notification = Notification.query.one()
+    assert notification.claimed_by is None and not notification.attempts
+
+def test_periodic_drainer_retries_without_a_status_update(app, monkeypatch):
+    queue('a@example.com')
+    connection = FakeConnection()
+    use_connection(monkeypatch, connection)
+    monkeypatch.setattr(utils, '_drainer_pid', None)
+    app.config['NOTIFICATION_DRAIN_INTERVAL'] = 0.05
+    try:
+        utils.ensure_notification_drainer(app)
+        deadline = time.monotonic() + 5
+        while not connection.sent and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        app.config['NOTIFICATION_DRAIN_INTERVAL'] = 0
+        time.sleep(0.1)  # Let the loop see the change and exit
+    assert connection.sent == ['a@example.com']
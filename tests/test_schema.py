@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import db, upgrade_schema, _apply_ddl
+from models import Job
+
+def test_upgrade_adds_missing_index_and_is_idempotent(app):
+    db.session.execute(db.text('DROP INDEX ix_job_updated_at'))
+    db.session.commit()
+    upgrade_schema()
+    upgrade_schema()
+    assert 'ix_job_updated_at' in {index['name'] for index in db.inspect(db.engine).get_indexes('job')}
+
+def test_concurrent_upgrade_loser_is_ignored(app):
+    # Another worker added the column between our inspection and our ALTER
+    ddl = db.text('ALTER TABLE job ADD COLUMN updated_at DATETIME')
+    assert _apply_ddl(lambda connection: connection.execute(ddl),
+                      lambda fresh: 'updated_at' in {c['name'] for c in fresh.get_columns('job')}) is False
+    assert Job.query.count() == 0
+
+def test_other_ddl_errors_still_raise(app):
+    ddl = db.text('ALTER TABLE missing_table ADD COLUMN note TEXT')
+    with pytest.raises(OperationalError):
+        _apply_ddl(lambda connection: connection.execute(ddl), lambda fresh: False)
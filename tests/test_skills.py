@@ -0,0 +1,58 @@
+from app import db
+from models import Job, JobSeekerProfile, Skill, SkillAlias
+from skills import parse_skills, sync_job_skills, sync_profile_skills, jobs_requiring, seekers_with, find_skill
+from conftest import make_user
+
+def add_job(employer, skills):
+    job = Job(title='Engineer', description='Build things', posted_by=employer.id, skills_required=skills)
+    db.session.add(job)
+    sync_job_skills(job)
+    db.session.commit()
+    return job.id
+
+def job_ids(name):
+    return sorted(job.id for job in jobs_requiring(name))
+
+def test_parse_skills_dedupes_case_and_whitespace():
+    assert parse_skills(' Python,python ;  Machine   Learning\nSQL,,') == ['Python', 'Machine Learning', 'SQL']
+
+def test_aliases_resolve_on_save_and_lookup(app):
+    employer = make_user('employer@example.com', 'employer')
+    first = add_job(employer, 'JavaScript')
+    second = add_job(employer, 'JS, Postgres')
+    assert job_ids('javascript') == job_ids('JS') == job_ids('js') == [first, second]
+    assert job_ids('postgres') == job_ids('PostgreSQL') == [second]
+    # The alias spelling is stored, not a second skill
+    assert Skill.query.filter_by(key='js').count() == 0
+    assert SkillAlias.query.filter_by(key='js').one().skill_id == find_skill('JavaScript').id
+
+def test_builtin_alias_finds_skill_saved_under_canonical_name(app):
+    employer = make_user('employer@example.com', 'employer')
+    job = add_job(employer, 'Kubernetes')
+    assert job_ids('k8s') == [job]
+
+def test_java_and_javascript_stay_separate(app):
+    employer = make_user('employer@example.com', 'employer')
+    java = add_job(employer, 'Java')
+    javascript = add_job(employer, 'JavaScript')
+    assert job_ids('Java') == [java]
+    assert job_ids('JavaScript') == [javascript]
+
+def test_unknown_skill_matches_nothing(app):
+    employer = make_user('employer@example.com', 'employer')
+    add_job(employer, 'Python')
+    assert job_ids('Cobol') == []
+
+def test_resync_replaces_profile_skills(app):
+    seeker = make_user('seeker@example.com', 'jobseeker')
+    profile = JobSeekerProfile(user_id=seeker.id, first_name='Ava', last_name='Khan', skills='Go, Rust')
+    db.session.add(profile)
+    sync_profile_skills(profile)
+    db.session.commit()
+    assert [p.id for p in seekers_with('golang')] == [profile.id]
+
+    profile.skills = 'Rust'
+    sync_profile_skills(profile)
+    db.session.commit()
+    assert seekers_with('go').all() == []
+    assert [p.id for p in seekers_with('rust')] == [profile.id]
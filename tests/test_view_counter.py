@@ -0,0 +1,82 @@
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app import db
+from models import Job, JobView
+from view_counter import ViewCounter
+from conftest import make_user
+
+@pytest.fixture
+def counter(app):
+    counter = ViewCounter(app)
+    counter._flusher_pid = os.getpid()  # Flushes happen only when the test asks
+    return counter
+
+def make_jobs(count):
+    employer = make_user('employer@example.com', 'employer')
+    jobs = [Job(title=f'Engineer {i}', description='Build things', posted_by=employer.id, is_approved=True)
+            for i in range(count)]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+def views():
+    db.session.expire_all()
+    return {row.job_id: row.views for row in JobView.query}
+
+def test_views_are_buffered_then_upserted(app, counter):
+    job, = make_jobs(1)
+    for _ in range(3):
+        counter.increment(job.id)
+    assert views() == {}
+    assert counter.flush() == 1
+    assert views() == {job.id: 3}
+    counter.increment(job.id)
+    assert counter.flush() == 1
+    assert views() == {job.id: 4}
+    assert counter.flush() == 0
+
+def test_full_buffer_wakes_the_flusher_instead_of_flushing_inline(app, counter):
+    first, second = make_jobs(2)
+    counter.max_pending = 2
+    counter.increment(first.id)
+    assert not counter._wake.is_set()
+    counter.increment(second.id)
+    assert counter._wake.is_set()
+    assert views() == {}
+
+def test_failed_flush_requeues_the_batch(app, counter, monkeypatch):
+    job, = make_jobs(1)
+    counter.increment(job.id)
+    counter.increment(job.id)
+
+    def database_down(connection, rows):
+        raise OperationalError('UPSERT', {}, Exception('connection refused'))
+    monkeypatch.setattr(counter, '_upsert', database_down)
+    assert counter.flush() == 0
+    assert counter._pending == {(job.id, datetime.utcnow().date()): 2}
+
+    monkeypatch.undo()
+    assert counter.flush() == 1
+    assert views() == {job.id: 2}
+
+def test_poison_row_is_dropped_without_blocking_the_rest(app, counter, monkeypatch):
+    job, = make_jobs(1)
+    deleted_job_id = job.id + 1000
+    upsert = counter._upsert
+
+    def foreign_key_check(connection, rows):
+        # SQLite does not enforce foreign keys here, so reject the row like PostgreSQL would
+        if any(row['job_id'] == deleted_job_id for row in rows):
+            raise IntegrityError('UPSERT', {}, Exception('violates foreign key constraint'))
+        upsert(connection, rows)
+    monkeypatch.setattr(counter, '_upsert', foreign_key_check)
+
+    counter.increment(job.id)
+    counter.increment(deleted_job_id)
+    assert counter.flush() == 1
+    assert views() == {job.id: 1}
+    assert counter._pending == {}
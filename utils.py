@@ -1,7 +1,15 @@
 import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from flask import current_app
+from markupsafe import Markup
 from flask_mail import Message
-from app import mail
+from sqlalchemy import or_
+from app import db, mail
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
@@ -26,6 +34,170 @@ def send_email(subject, recipients, body, html_body=None):
         current_app.logger.error(f"Failed to send email: {str(e)}")
         return False
 
+_delivery_lock = threading.Lock()
+
+# Refusals tied to one message; anything else means the connection itself is unusable
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError,
+                   UnicodeError, ValueError)
+
+def _claim_notifications(app, batch_size):
+    """Atomically claim due notifications for this worker and return the claim token"""
+    from models import Notification
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=app.config['NOTIFICATION_CLAIM_TIMEOUT'])
+    token = uuid.uuid4().hex
+    due = db.session.query(Notification.id).filter(
+        Notification.sent_at.is_(None),
+        db.func.coalesce(Notification.attempts, 0) < app.config['NOTIFICATION_MAX_ATTEMPTS'],
+        or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+        or_(Notification.claimed_at.is_(None), Notification.claimed_at < stale)
+    ).order_by(Notification.id).limit(batch_size)
+    # Re-checking the claim in the UPDATE means concurrent drainers never share a row
+    Notification.query.filter(
+        Notification.id.in_(due.scalar_subquery()),
+        Notification.sent_at.is_(None),
+        or_(Notification.claimed_at.is_(None), Notification.claimed_at < stale)
+    ).update({'claimed_at': now, 'claimed_by': token}, synchronize_session=False)
+    db.session.commit()
+    return token
+
+def _record_failure(app, notification_id, error):
+    """Count a failed attempt and back off exponentially before the next one"""
+    from models import Notification
+    attempts = (db.session.query(Notification.attempts).filter_by(id=notification_id).scalar() or 0) + 1
+    Notification.query.filter_by(id=notification_id).update({
+        'attempts': attempts,
+        'last_error': str(error)[:500],
+        'next_attempt_at': datetime.utcnow() + timedelta(minutes=2 ** attempts),
+        'claimed_at': None,
+        'claimed_by': None,
+    }, synchronize_session=False)
+    if attempts >= app.config['NOTIFICATION_MAX_ATTEMPTS']:
+        app.logger.error(f"Giving up on notification {notification_id} after {attempts} attempts: {error}")
+
+def deliver_notifications(app, batch_size=100):
+    """Drain the notification outbox, reusing one SMTP connection per batch
+
+    Rows are claimed before sending, so drainers in other workers skip them.
+    A message the server refuses is retried with backoff up to
+    NOTIFICATION_MAX_ATTEMPTS times without holding up the rest of the queue.
+    """
+    from models import Notification, User
+    
+    # One drainer per process is enough; other processes are kept apart by the claim
+    if not _delivery_lock.acquire(blocking=False):
+        return 0
+    
+    delivered = 0
+    try:
+        with app.app_context():
+            while True:
+                token = _claim_notifications(app, batch_size)
+                claimed = db.session.query(
+                    Notification.id, Notification.subject, Notification.body, User.email
+                ).join(User, Notification.user_id == User.id).filter(
+                    Notification.claimed_by == token
+                ).order_by(Notification.id).all()
+                if not claimed:
+                    break
+                
+                sent_ids = []
+                in_flight = None
+                try:
+                    with mail.connect() as connection:
+                        for notification in claimed:
+                            in_flight = notification.id
+                            try:
+                                connection.send(Message(
+                                    subject=notification.subject,
+                                    recipients=[notification.email],
+                                    body=notification.body,
+                                    sender=app.config['MAIL_DEFAULT_SENDER']
+                                ))
+                            except _MESSAGE_ERRORS as e:
+                                _record_failure(app, notification.id, e)
+                                continue
+                            sent_ids.append(notification.id)
+                        in_flight = None
+                except Exception as e:
+                    app.logger.error(f"Failed to deliver notifications: {str(e)}")
+                    if in_flight is not None:
+                        # A message that keeps breaking the connection must not block the queue
+                        _record_failure(app, in_flight, e)
+                
+                if sent_ids:
+                    Notification.query.filter(Notification.id.in_(sent_ids)).update(
+                        {'sent_at': datetime.utcnow(), 'claimed_at': None, 'claimed_by': None},
+                        synchronize_session=False
+                    )
+                # Hand back rows the lost connection never reached, without charging an attempt
+                unsent = Notification.query.filter(
+                    Notification.claimed_by == token, Notification.sent_at.is_(None)
+                ).update({'claimed_at': None, 'claimed_by': None}, synchronize_session=False)
+                db.session.commit()
+                delivered += len(sent_ids)
+                if unsent:
+                    # The mail server is unreachable; leave the rest for the next run
+                    break
+    finally:
+        _delivery_lock.release()
+    return delivered
+
+_drainer_pid = None
+_drainer_lock = threading.Lock()
+
+def _run_drainer(app):
+    # Interval is re-read each pass; setting it to 0 stops the loop
+    while app.config.get('NOTIFICATION_DRAIN_INTERVAL'):
+        time.sleep(app.config['NOTIFICATION_DRAIN_INTERVAL'])
+        try:
+            deliver_notifications(app)
+        except Exception as e:
+            app.logger.error(f"Notification drainer failed: {str(e)}")
+
+def ensure_notification_drainer(app):
+    """Start this process's outbox drainer thread if it is not running yet"""
+    global _drainer_pid
+    pid = os.getpid()
+    if _drainer_pid == pid:
+        return
+    with _drainer_lock:
+        if _drainer_pid == pid:
+            return
+        _drainer_pid = pid
+    threading.Thread(target=_run_drainer, args=(app,), daemon=True).start()
+
+def start_notification_drainer(app):
+    """Drain the outbox every NOTIFICATION_DRAIN_INTERVAL seconds from a daemon thread
+
+    Picks up rows waiting on backoff and rows released after an SMTP outage,
+    which no status update would otherwise retry. Started lazily on the first
+    request so each forked worker gets its own thread; the claim keeps them apart.
+    """
+    if app.config.get('NOTIFICATION_DRAIN_INTERVAL'):
+        app.before_request(lambda: ensure_notification_drainer(app))
+
+# Rendered blog bodies keyed by (post id, updated_at), oldest evicted first
+_rendered_posts = OrderedDict()
+_rendered_posts_lock = threading.Lock()
+
+def render_post_body(post):
+    """Return (body_html, read_minutes) for a blog post, cached until the post is updated"""
+    key = (post.id, post.updated_at)
+    with _rendered_posts_lock:
+        if key in _rendered_posts:
+            _rendered_posts.move_to_end(key)
+            return _rendered_posts[key]
+    
+    # Only a cache miss touches the (possibly deferred) content column
+    content = post.content or ''
+    rendered = (Markup(content.replace('\n', '<br>')), max(1, int(len(content.split()) / 200 + 0.5)))
+    with _rendered_posts_lock:
+        _rendered_posts[key] = rendered
+        while len(_rendered_posts) > current_app.config.get('BLOG_RENDER_CACHE_SIZE', 256):
+            _rendered_posts.popitem(last=False)
+    return rendered
+
 def format_salary(min_salary, max_salary):
     """Format salary range for display"""
     if min_salary and max_salary:
@@ -0,0 +1,128 @@
+import os
+import atexit
+import threading
+from datetime import datetime
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+
+class ViewCounter:
+    """Buffers job page views in memory and flushes them as batched daily upserts"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self._wake = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get('VIEW_FLUSH_INTERVAL', 30)
+        self.max_pending = app.config.get('VIEW_MAX_PENDING', 10000)
+        # A clean worker shutdown loses nothing; a crash loses at most one interval
+        atexit.register(self.flush)
+
+    def increment(self, job_id):
+        """Count one view of a job; never touches the database on the hot path"""
+        key = (job_id, datetime.utcnow().date())
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            full = len(self._pending) >= self.max_pending
+        self._ensure_flusher()
+        if full:
+            # Bound memory by flushing early rather than dropping views, off the request thread
+            self._wake.set()
+
+    def flush(self):
+        """Write buffered deltas in one transaction and return the number of rows upserted
+
+        If the batch is rejected by a constraint (e.g. a view of a job deleted
+        since), rows are retried one by one and only the failing ones dropped;
+        any other error puts the whole batch back for the next flush.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        rows = [{'job_id': job_id, 'day': day, 'views': count} for (job_id, day), count in batch.items()]
+        with self.app.app_context():
+            from app import db
+            try:
+                with db.engine.begin() as connection:
+                    self._upsert(connection, rows)
+            except IntegrityError:
+                return self._flush_rows(db, rows)
+            except Exception as e:
+                self.app.logger.error(f"Failed to flush job views: {str(e)}")
+                self._requeue(rows)
+                return 0
+        return len(rows)
+
+    def _flush_rows(self, db, rows):
+        """Upsert rows in separate transactions so one bad row cannot hold back the rest"""
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                with db.engine.begin() as connection:
+                    self._upsert(connection, [row])
+                written += 1
+            except IntegrityError as e:
+                self.app.logger.warning(f"Dropped {row['views']} views of job {row['job_id']}: {str(e)}")
+            except Exception as e:
+                # Not this row's fault: put it and the untried rows back
+                self.app.logger.error(f"Failed to flush job views: {str(e)}")
+                self._requeue(rows[i:])
+                break
+        return written
+
+    def _requeue(self, rows):
+        # Put the deltas back so the next flush retries them
+        with self._lock:
+            for row in rows:
+                key = (row['job_id'], row['day'])
+                if key in self._pending or len(self._pending) < self.max_pending:
+                    self._pending[key] = self._pending.get(key, 0) + row['views']
+
+    def _upsert(self, connection, rows):
+        from models import JobView
+        dialect = connection.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = dialect_insert(JobView)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['job_id', 'day'],
+                set_={'views': JobView.views + stmt.excluded.views}
+            )
+            connection.execute(stmt, rows)
+            return
+
+        # Portable fallback: update existing buckets, insert the rest
+        for row in rows:
+            result = connection.execute(
+                update(JobView).where(JobView.job_id == row['job_id'], JobView.day == row['day'])
+                .values(views=JobView.views + row['views'])
+            )
+            if result.rowcount == 0:
+                connection.execute(insert(JobView), row)
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked worker gets its own thread
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._run_flusher, daemon=True).start()
+
+    def _run_flusher(self):
+        while True:
+            # Woken early by increment() when the buffer fills up
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,144 @@
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from app import db
+from models import (User, JobSeekerProfile, EmployerProfile, Job, Application, SavedJob,
+                    Message, JobView)
+
+# Profile completion weights shown on the dashboards
+EMPLOYER_PROFILE_WEIGHTS = {'company_name': 25, 'company_description': 25, 'website': 20,
+                            'location': 15, 'industry': 15}
+JOBSEEKER_PROFILE_WEIGHTS = {'first_name': 20, 'skills': 20, 'resume_filename': 30,
+                             'bio': 15, 'location': 15}
+
+def profile_score(profile, weights):
+    """Percentage of weighted profile fields that are filled in"""
+    if profile is None:
+        return 0
+    return sum(weight for field, weight in weights.items() if getattr(profile, field))
+
+def recent_messages(user_id):
+    return Message.query.filter_by(recipient_id=user_id).order_by(
+        Message.sent_at.desc()
+    ).limit(5).all()
+
+def employer_dashboard(user):
+    """Aggregates for the employer dashboard, computed in SQL"""
+    job_count = db.session.query(func.count(Job.id)).filter(Job.posted_by == user.id).scalar()
+    application_total = db.session.query(func.count(Application.id)).join(
+        Job, Application.job_id == Job.id
+    ).filter(Job.posted_by == user.id).scalar()
+
+    recent_jobs = [dict(row._mapping) for row in db.session.query(
+        Job.id, Job.title, Job.category, Job.posted_at, Job.is_active, Job.is_approved
+    ).filter(Job.posted_by == user.id).order_by(Job.posted_at.desc()).limit(5)]
+
+    # Per-job counts only for the jobs shown, rather than for every posting
+    recent_ids = [job['id'] for job in recent_jobs]
+    counts = dict(db.session.query(Application.job_id, func.count(Application.id)).filter(
+        Application.job_id.in_(recent_ids)
+    ).group_by(Application.job_id).all()) if recent_jobs else {}
+    views = dict(db.session.query(JobView.job_id, func.sum(JobView.views)).filter(
+        JobView.job_id.in_(recent_ids)
+    ).group_by(JobView.job_id).all()) if recent_jobs else {}
+    for job in recent_jobs:
+        job['application_count'] = counts.get(job['id'], 0)
+        job['view_count'] = views.get(job['id'], 0)
+
+    # Views reach the database in batches, so these lag by up to VIEW_FLUSH_INTERVAL
+    total_views = db.session.query(func.coalesce(func.sum(JobView.views), 0)).join(
+        Job, JobView.job_id == Job.id
+    ).filter(Job.posted_by == user.id).scalar()
+
+    recent_applications = [dict(row._mapping) for row in db.session.query(
+        Application.id, Application.status, Application.applied_at, Job.title.label('job_title'),
+        User.email, JobSeekerProfile.first_name, JobSeekerProfile.last_name
+    ).join(Job, Application.job_id == Job.id).join(
+        User, Application.user_id == User.id
+    ).outerjoin(JobSeekerProfile, JobSeekerProfile.user_id == User.id).filter(
+        Job.posted_by == user.id
+    ).order_by(Application.applied_at.desc()).limit(5)]
+    for application in recent_applications:
+        if application['first_name']:
+            application['applicant_name'] = f"{application['first_name']} {application['last_name']}"
+        else:
+            application['applicant_name'] = application['email']
+
+    return {
+        'job_count': job_count,
+        'recent_jobs': recent_jobs,
+        'application_total': application_total,
+        'recent_applications': recent_applications,
+        'total_views': total_views,
+        'company_score': profile_score(user.employer_profile, EMPLOYER_PROFILE_WEIGHTS),
+        'messages': recent_messages(user.id),
+    }
+
+def jobseeker_dashboard(user):
+    """Aggregates for the job seeker dashboard, computed in SQL"""
+    application_count = db.session.query(func.count(Application.id)).filter(
+        Application.user_id == user.id
+    ).scalar()
+    saved_count = db.session.query(func.count(SavedJob.id)).filter(
+        SavedJob.user_id == user.id
+    ).scalar()
+
+    recent_applications = [dict(row._mapping) for row in db.session.query(
+        Application.status, Application.applied_at, Job.id.label('job_id'),
+        Job.title.label('job_title'), EmployerProfile.company_name
+    ).join(Job, Application.job_id == Job.id).outerjoin(
+        EmployerProfile, EmployerProfile.user_id == Job.posted_by
+    ).filter(Application.user_id == user.id).order_by(Application.applied_at.desc()).limit(5)]
+
+    recent_saved = [dict(row._mapping) for row in db.session.query(
+        SavedJob.saved_at, Job.id.label('job_id'), Job.title.label('job_title'),
+        EmployerProfile.company_name
+    ).join(Job, SavedJob.job_id == Job.id).outerjoin(
+        EmployerProfile, EmployerProfile.user_id == Job.posted_by
+    ).filter(SavedJob.user_id == user.id).order_by(SavedJob.saved_at.desc()).limit(3)]
+
+    return {
+        'application_count': application_count,
+        'recent_applications': recent_applications,
+        'saved_count': saved_count,
+        'recent_saved': recent_saved,
+        'profile_score': profile_score(user.jobseeker_profile, JOBSEEKER_PROFILE_WEIGHTS),
+        'messages': recent_messages(user.id),
+    }
+
+def admin_dashboard():
+    """Site-wide statistics and recent activity for the admin dashboard"""
+    recent_jobs = Job.query.options(
+        joinedload(Job.posted_by_user).joinedload(User.employer_profile)
+    ).order_by(Job.posted_at.desc()).limit(10).all()
+    recent_users = User.query.options(
+        selectinload(User.jobseeker_profile), selectinload(User.employer_profile)
+    ).order_by(User.created_at.desc()).limit(10).all()
+    
+    # Active postings held back for review, with the job each one was flagged against
+    original = aliased(Job)
+    review_jobs = [dict(row._mapping) for row in db.session.query(
+        Job.id, Job.title, Job.posted_at, Job.duplicate_of, EmployerProfile.company_name,
+        original.title.label('duplicate_title')
+    ).outerjoin(EmployerProfile, EmployerProfile.user_id == Job.posted_by).outerjoin(
+        original, original.id == Job.duplicate_of
+    ).filter(Job.is_active == True, Job.is_approved == False).order_by(  # noqa: E712
+        Job.posted_at.desc()
+    ).limit(20)]
+
+    return {
+        'total_users': User.query.count(),
+        'total_jobs': Job.query.count(),
+        'pending_jobs': Job.query.filter_by(is_approved=False).count(),
+        'total_applications': Application.query.count(),
+        'recent_jobs': recent_jobs,
+        'recent_users': recent_users,
+        'review_jobs': review_jobs,
+        'recent_jobseeker_count': sum(1 for u in recent_users if u.user_type == 'jobseeker'),
+        'recent_employer_count': sum(1 for u in recent_users if u.user_type == 'employer'),
+        'recent_active_job_count': sum(1 for job in recent_jobs if job.is_active),
+        'total_job_views': db.session.query(func.coalesce(func.sum(JobView.views), 0)).scalar(),
+        'job_views_today': db.session.query(func.coalesce(func.sum(JobView.views), 0)).filter(
+            JobView.day == datetime.utcnow().date()
+        ).scalar(),
+    }